@@ -0,0 +1,95 @@
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views import main
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+from msd.core.utils.db import estimate_count
+
+CURSOR_VAR = 'after'
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that reports the planner's row estimate instead of running `COUNT(*)` for large results.
+
+    Results estimated below `exact_count_threshold` rows are still counted exactly, that is cheap and keeps small
+    (e.g. filtered or searched) lists accurate.
+    """
+    exact_count_threshold = 10_000
+
+    @cached_property
+    def count_is_estimated(self):
+        return self.estimated_count is not None and self.estimated_count >= self.exact_count_threshold
+
+    @cached_property
+    def estimated_count(self):
+        return estimate_count(self.object_list)
+
+    @cached_property
+    def count(self):
+        if self.count_is_estimated:
+            return self.estimated_count
+
+        return super().count
+
+
+class KeysetChangeList(main.ChangeList):
+    """
+    Change list that pages by primary key (`?after=<pk>`) instead of `OFFSET` while it is in its default `-pk` order.
+
+    Each page is an index range scan however deep into the table it is. Once the list is sorted by a column the
+    regular numbered pages are used.
+    """
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Filter, search and sort links start over from the first page
+        if not new_params or CURSOR_VAR not in new_params:
+            remove = [*(remove or []), CURSOR_VAR]
+        return super().get_query_string(new_params, remove)
+
+    def get_results(self, request):
+        self.is_keyset = main.ORDER_VAR not in self.params and list(self.model_admin.get_ordering(request)) == ['-pk']
+        if not self.is_keyset:
+            return super().get_results(request)
+
+        queryset = self.queryset
+        self.cursor = self.params.get(CURSOR_VAR)
+        if self.cursor is not None:
+            try:
+                queryset = queryset.filter(pk__lt=int(self.cursor))
+            except ValueError:
+                raise IncorrectLookupParameters
+
+        # One extra row tells whether there is a next page without counting
+        result_list = list(queryset[:self.list_per_page + 1])
+        has_next = len(result_list) > self.list_per_page
+
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count = self.paginator.count
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = result_list[:self.list_per_page]
+        self.can_show_all = False
+        self.multi_page = has_next or self.cursor is not None
+        self.next_page_url = has_next and self.get_query_string({CURSOR_VAR: self.result_list[-1].pk})
+        self.first_page_url = self.cursor is not None and self.get_query_string()
+
+
+class ScalableModelAdmin:
+    """
+    ModelAdmin mixin for very large tables: estimated counts, keyset paging and no unfiltered `COUNT(*)`.
+
+    Pair it with indexes covering `list_filter` and the search done by `get_search_results`.
+    """
+    ordering = ('-pk',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
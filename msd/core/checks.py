@@ -0,0 +1,120 @@
+import re
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.core import checks
+from django.db import connections, migrations
+from django.db.migrations.executor import MigrationExecutor
+
+from .operations import AddFieldWithBackfill, BackfillField
+from .utils.db import estimate_table_rows
+
+VARCHAR_TYPE = re.compile(r'varchar\((\d+)\)')
+
+
+def changes_column_type(old_type, new_type):
+    if old_type == new_type:
+        return False
+
+    # Making a varchar longer or text only changes the catalog
+    old_varchar = VARCHAR_TYPE.fullmatch(old_type or '')
+    new_varchar = VARCHAR_TYPE.fullmatch(new_type or '')
+    if old_varchar and new_type == 'text':
+        return False
+    return not (old_varchar and new_varchar and int(new_varchar[1]) >= int(old_varchar[1]))
+
+
+def get_field_change(from_state, app_label, operation, connection):
+    old_field = from_state.apps.get_model(app_label, operation.model_name)._meta.get_field(operation.name)
+    new_field = operation.field.clone()
+    new_field.set_attributes_from_name(operation.name)
+    new_field.model = old_field.model
+
+    # The column type of relations is that of the related primary key, which the unrendered field cannot tell
+    old_type = None if old_field.is_relation else old_field.db_parameters(connection)['type']
+    new_type = None if new_field.is_relation else new_field.db_parameters(connection)['type']
+    if changes_column_type(old_type, new_type):
+        return 'rewrites or scans the table while blocking reads and writes'
+    if old_field.null and not new_field.null:
+        return 'scans the table for NULLs while blocking reads and writes'
+    if (new_field.unique and not old_field.unique) or (new_field.db_index and not old_field.db_index):
+        return 'builds an index while blocking writes'
+    return None
+
+
+def get_blocking_reason(migration, operation, from_state, connection):
+    """
+    Return how `operation` blocks the table it changes, or None if it does not (for more than a moment).
+    """
+    if isinstance(operation, (AddIndexConcurrently, AddFieldWithBackfill, BackfillField)):
+        return 'must be in a migration with `atomic = False`' if migration.atomic else None
+    if isinstance(operation, migrations.AddIndex):
+        return 'builds the index while blocking writes, use `AddIndexConcurrently`'
+    if isinstance(operation, migrations.AddConstraint):
+        return 'validates the constraint while blocking writes'
+    if isinstance(operation, migrations.AlterUniqueTogether):
+        return 'builds a unique index while blocking writes'
+    if isinstance(operation, migrations.AddField):
+        if operation.field.unique or operation.field.db_index or operation.field.is_relation:
+            return 'builds an index or checks a foreign key while blocking writes, use `AddFieldWithBackfill`'
+        return None
+    if isinstance(operation, migrations.AlterField):
+        return get_field_change(from_state, migration.app_label, operation, connection)
+    return None
+
+
+def find_blocking_operations(connection, min_rows):
+    """
+    Yield `(migration, operation, table, rows, reason)` for the unapplied migration operations that would block a
+    table of at least `min_rows` rows.
+    """
+    executor = MigrationExecutor(connection)
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    if not plan:
+        return
+
+    state = executor._create_project_state(with_applied_migrations=True)
+    for migration, _ in plan:
+        for operation in migration.operations:
+            # Operations on existing models only, those on models created by the plan find them empty
+            model_name = getattr(operation, 'model_name', None) or getattr(operation, 'name', None)
+            reason = None
+            if (migration.app_label, str(model_name).lower()) in state.models:
+                reason = get_blocking_reason(migration, operation, state, connection)
+
+            if reason:
+                table = state.apps.get_model(migration.app_label, model_name)._meta.db_table
+                rows = estimate_table_rows(table, connection.alias)
+                if rows >= min_rows:
+                    yield migration, operation, table, rows, reason
+
+            operation.state_forwards(migration.app_label, state)
+
+
+def check_blocking_migrations(app_configs, databases=None, **kwargs):
+    """
+    Flag unapplied migrations that would lock large tables, most importantly the user table, which every login reads
+    and writes. Runs before `migrate` migrates, and with `check --database`.
+    """
+    errors = []
+    for alias in databases or []:
+        connection = connections[alias]
+        if connection.vendor != 'postgresql':
+            continue
+
+        for migration, operation, table, rows, reason in find_blocking_operations(
+            connection, settings.MIGRATION_LARGE_TABLE_ROWS
+        ):
+            errors.append(
+                checks.Error(
+                    f'{operation.describe()} {reason} (table {table} has about {rows} rows)',
+                    hint=(
+                        'Use the operations of `msd.core.operations` instead, or if it must run as it is (e.g. in '
+                        'a maintenance window) migrate with `--skip-checks`'
+                    ),
+                    obj=migration,
+                    id='msd.E001',
+                )
+            )
+
+    return errors
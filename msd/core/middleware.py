@@ -0,0 +1,121 @@
+import random
+import time
+
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.core.exceptions import MiddlewareNotUsed
+from django.middleware import csrf
+from rest_framework.exceptions import APIException
+from rest_framework.settings import api_settings
+
+from .profiling import QueryRecorder, SamplingProfiler, record_queries, write_profile
+
+
+class BrowserOnlyMiddlewareMixin:
+    """
+    Skip the middleware entirely for API requests.
+
+    API clients authenticate with JWTs (see `CustomJWTAuthentication`) and never use sessions, CSRF cookies or
+    flash messages, so loading and saving that state is wasted work on every `/api/` request. Paths listed in
+    `LEAN_API_PATHS` bypass the middleware unless they also match `LEAN_API_EXCLUDED_PATHS` (e.g. social login,
+    which keeps its OAuth state in the session). Everything else, like `/admin/`, keeps the full stack.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.lean_paths = tuple(settings.LEAN_API_PATHS)
+        self.excluded_paths = tuple(settings.LEAN_API_EXCLUDED_PATHS)
+
+    def is_lean(self, request):
+        path = request.path_info
+        return path.startswith(self.lean_paths) and not path.startswith(self.excluded_paths)
+
+    def __call__(self, request):
+        if self.is_lean(request):
+            return self.get_response(request)
+
+        return super().__call__(request)
+
+
+class SessionMiddleware(BrowserOnlyMiddlewareMixin, sessions_middleware.SessionMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(BrowserOnlyMiddlewareMixin, csrf.CsrfViewMiddleware):
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        # View hooks are called by the handler directly, not through `__call__`
+        if self.is_lean(request):
+            return None
+
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class AuthenticationMiddleware(BrowserOnlyMiddlewareMixin, auth_middleware.AuthenticationMiddleware):
+    pass
+
+
+class MessageMiddleware(BrowserOnlyMiddlewareMixin, messages_middleware.MessageMiddleware):
+    pass
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests on demand, writing flamegraph-ready stacks and SQL timings to `PROFILING_DIRECTORY`.
+
+    Requests of staff users carrying an `X-Profile` header are profiled, and `PROFILING_SAMPLE_RATE` of all other
+    requests. The response of a profiled request names its profile in `X-Profile-Id` (see `msd.core.profiling`).
+    With `PROFILING_ENABLED` off the middleware removes itself from the stack and costs nothing.
+    """
+    header = 'HTTP_X_PROFILE'
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        with SamplingProfiler(settings.PROFILING_INTERVAL) as profiler, record_queries(QueryRecorder()) as recorder:
+            response = self.get_response(request)
+
+        info = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': (time.perf_counter() - started) * 1000,
+        }
+        response['X-Profile-Id'] = write_profile(
+            settings.PROFILING_DIRECTORY, profiler, recorder, info, settings.PROFILING_MAX_PROFILES
+        )
+        return response
+
+    def should_profile(self, request):
+        if self.header in request.META:
+            return self.is_staff(request)
+
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def is_staff(self, request):
+        # The session user for browser requests, API requests are only authenticated in the view
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return user.is_staff
+
+        for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+            try:
+                result = authentication_class().authenticate(request)
+            except APIException:
+                return False
+
+            if result is not None:
+                return result[0].is_staff
+
+        return False
@@ -0,0 +1,257 @@
+"""
+Migration operations that change large tables without blocking their readers and writers for long.
+
+All of them must run in migrations with `atomic = False`, so that every step commits on its own. See
+`msd.core.checks` for the check flagging the operations that do block.
+"""
+import copy
+import logging
+import time
+from functools import partial
+
+from django.contrib.postgres import operations as postgres_operations
+from django.db import OperationalError, migrations
+from django.db.models import NOT_PROVIDED
+
+from msd.core.utils.batching import iterate_pk_batches, short_transaction, throttle
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE of `lock_timeout` expiring
+LOCK_NOT_AVAILABLE = '55P03'
+
+
+def is_lock_timeout(error):
+    return getattr(error.__cause__, 'pgcode', None) == LOCK_NOT_AVAILABLE
+
+
+def retry_on_lock_timeout(function, lock_timeout='2s', attempts=5, using='default'):
+    """
+    Call `function` in a `short_transaction()`, up to `attempts` times while it times out waiting for a lock.
+
+    While a statement waits for a lock, every later query needing a conflicting one queues behind it. For the
+    `ACCESS EXCLUSIVE` lock DDL takes that is every query of the table, logins included, so it is better to give up
+    quickly and try again a little later than to wait for a long transaction to finish.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            with short_transaction(lock_timeout, using):
+                return function()
+        except OperationalError as ex:
+            if attempt == attempts or not is_lock_timeout(ex):
+                raise
+
+            logger.warning('Lock not available (attempt %s of %s), retrying: %s', attempt, attempts, ex)
+            time.sleep(attempt)
+
+
+def backfill(queryset, name, value, batch_size=1000, sleep=0.1, max_replication_lag=5, lock_timeout='2s', attempts=5):
+    """
+    Set field `name` of the rows of `queryset` to `value`, a constant or an expression, `batch_size` rows at a time.
+
+    Each batch is a short transaction of its own and the rows are filtered again when updated, so rows changed
+    meanwhile are skipped. Return the number of rows updated.
+    """
+    using = queryset.db
+    updated = 0
+    for pks in iterate_pk_batches(queryset, batch_size):
+        update = partial(queryset.filter(pk__in=pks).update, **{name: value})
+        updated += retry_on_lock_timeout(update, lock_timeout, attempts, using)
+        throttle(sleep, max_replication_lag, using)
+
+    return updated
+
+
+def set_not_null(schema_editor, model, field, lock_timeout='2s', attempts=5):
+    """
+    Make the column of `field` NOT NULL without scanning the table under an `ACCESS EXCLUSIVE` lock.
+
+    A `CHECK (column IS NOT NULL)` constraint is added without validating existing rows and validated separately,
+    which scans the table without blocking writes. With it in place, PostgreSQL (12 and later) sets NOT NULL without
+    another scan, after which the constraint is redundant and dropped. The two are separate statements: in one
+    `ALTER TABLE`, the constraint is dropped before NOT NULL is checked, which then scans the table again.
+    """
+    quote_name = schema_editor.quote_name
+    using = schema_editor.connection.alias
+    table = quote_name(model._meta.db_table)
+    column = quote_name(field.column)
+    constraint = quote_name(schema_editor._create_index_name(model._meta.db_table, [field.column], '_notnull'))
+
+    steps = [
+        f'ALTER TABLE {table} ADD CONSTRAINT {constraint} CHECK ({column} IS NOT NULL) NOT VALID',
+        f'ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}',
+        f'ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL',
+        f'ALTER TABLE {table} DROP CONSTRAINT {constraint}',
+    ]
+    for sql in steps:
+        retry_on_lock_timeout(partial(schema_editor.execute, sql), lock_timeout, attempts, using)
+
+
+class AddIndexConcurrently(postgres_operations.AddIndexConcurrently):
+    """
+    Django's `AddIndexConcurrently`, which first drops an invalid index of the same name, left behind by a build that
+    failed or was interrupted, so that the migration can just be run again.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        self._ensure_not_in_transaction(schema_editor)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            self.drop_invalid_index(schema_editor)
+        super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def drop_invalid_index(self, schema_editor):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid '
+                'WHERE pg_class.relname = %s AND pg_table_is_visible(pg_class.oid) AND NOT pg_index.indisvalid',
+                [self.index.name],
+            )
+            invalid = cursor.fetchone() is not None
+
+        if invalid:
+            logger.warning('Dropping invalid index %s left by an earlier build', self.index.name)
+            schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {schema_editor.quote_name(self.index.name)}')
+
+
+class BackfillField(postgres_operations.NotInTransactionMixin, migrations.operations.base.Operation):
+    """
+    Set field `name` of the rows of `model_name` matching `condition`, by default those where it is NULL, to `value`,
+    a constant or an expression such as `Lower('email')`, in batches with `backfill()`.
+
+    Stopping it halfway is harmless, running the migration again continues with the rows that are left.
+    """
+    reduces_to_sql = False
+    reversible = True
+
+    def __init__(
+        self,
+        model_name,
+        name,
+        value,
+        condition=None,
+        batch_size=1000,
+        sleep=0.1,
+        max_replication_lag=5,
+        lock_timeout='2s',
+        attempts=5
+    ):
+        self.model_name = model_name
+        self.name = name
+        self.value = value
+        self.condition = condition
+        self.batch_size = batch_size
+        self.sleep = sleep
+        self.max_replication_lag = max_replication_lag
+        self.lock_timeout = lock_timeout
+        self.attempts = attempts
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        self._ensure_not_in_transaction(schema_editor)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+
+        queryset = model._default_manager.using(schema_editor.connection.alias)
+        if self.condition is None:
+            queryset = queryset.filter(**{f'{self.name}__isnull': True})
+        else:
+            queryset = queryset.filter(self.condition)
+
+        updated = backfill(
+            queryset, self.name, self.value, self.batch_size, self.sleep, self.max_replication_lag, self.lock_timeout,
+            self.attempts
+        )
+        logger.info('Backfilled %s of %s rows', self.name, updated)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        pass
+
+    def describe(self):
+        return f'Backfill field {self.name} of {self.model_name} in batches'
+
+    @property
+    def migration_name_fragment(self):
+        return f'backfill_{self.model_name.lower()}_{self.name.lower()}'
+
+
+class AddFieldWithBackfill(postgres_operations.NotInTransactionMixin, migrations.AddField):
+    """
+    Add a field to a large table without locking it for longer than a moment.
+
+    The column is added nullable and without a default, which does not touch existing rows, then filled in with
+    `value` (the field's default if not given) by `BackfillField`, then made NOT NULL by `set_not_null()` unless the
+    field is nullable. Waiting for locks gives up after `lock_timeout` and is retried.
+
+    Rows inserted by code that does not know the field yet are NULL until the backfill reaches them, the field must
+    only be relied on once the migration has finished. Unique and indexed fields and relations are refused, their
+    index (and for relations, foreign key constraint) would be built while blocking writes: add the field without and
+    its index with `AddIndexConcurrently` afterwards.
+    """
+
+    def __init__(
+        self,
+        model_name,
+        name,
+        field,
+        value=NOT_PROVIDED,
+        batch_size=1000,
+        sleep=0.1,
+        max_replication_lag=5,
+        lock_timeout='2s',
+        attempts=5,
+        preserve_default=True
+    ):
+        if field.unique or field.db_index or field.is_relation:
+            raise ValueError(f'{self.__class__.__name__} does not add unique or indexed fields or relations')
+        if value is NOT_PROVIDED and not field.has_default() and not field.null:
+            raise ValueError(f'{self.__class__.__name__} needs a value or default for existing rows')
+
+        super().__init__(model_name, name, field, preserve_default)
+        self.value = value
+        self.batch_size = batch_size
+        self.sleep = sleep
+        self.max_replication_lag = max_replication_lag
+        self.lock_timeout = lock_timeout
+        self.attempts = attempts
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        self._ensure_not_in_transaction(schema_editor)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        using = schema_editor.connection.alias
+        if not self.allow_migrate_model(using, model):
+            return
+
+        field = model._meta.get_field(self.name)
+        nullable = copy.copy(field)
+        nullable.null = True
+        nullable.default = NOT_PROVIDED
+        nullable.__dict__.pop('_get_default', None)
+        retry_on_lock_timeout(
+            partial(schema_editor.add_field, model, nullable), self.lock_timeout, self.attempts, using
+        )
+
+        value = field.get_default() if self.value is NOT_PROVIDED else self.value
+        if value is not None:
+            BackfillField(
+                self.model_name, self.name, value, None, self.batch_size, self.sleep, self.max_replication_lag,
+                self.lock_timeout, self.attempts
+            ).database_forwards(app_label, schema_editor, from_state, to_state)
+
+        if not field.null:
+            set_not_null(schema_editor, model, field, self.lock_timeout, self.attempts)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        self._ensure_not_in_transaction(schema_editor)
+        remove_field = partial(super().database_backwards, app_label, schema_editor, from_state, to_state)
+        retry_on_lock_timeout(remove_field, self.lock_timeout, self.attempts, schema_editor.connection.alias)
+
+    def describe(self):
+        return f'Add field {self.name} to {self.model_name} and backfill it in batches'
+
+    def reduce(self, operation, app_label):
+        # Never merged into a plain `AddField`, which would add the column in one blocking step
+        return super(migrations.AddField, self).reduce(operation, app_label)
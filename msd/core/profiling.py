@@ -0,0 +1,124 @@
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler sampling the call stack of one thread from a background thread every `interval` seconds.
+
+    Unlike `cProfile`, which hooks every call and return, the profiled code runs at full speed between samples, the
+    cost is one stack walk per interval. Stacks are written in the collapsed format (`outer;inner count` per line)
+    read by `flamegraph.pl`, speedscope and most other flamegraph tools.
+    """
+
+    def __init__(self, interval=0.001, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='sampling-profiler', daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    @property
+    def samples(self):
+        return sum(self.stacks.values())
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            # Code objects only, they are formatted once per distinct stack when writing
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            self.stacks[tuple(stack)] += 1
+
+    def write_collapsed(self, file):
+        for stack, count in self.stacks.most_common():
+            frames = ';'.join(f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})' for code in reversed(stack))
+            file.write(f'{frames} {count}\n')
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper recording the duration of every query (see `record_queries()`).
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': context['connection'].alias,
+                'sql': sql,
+                'many': many,
+                'duration_ms': (time.perf_counter() - started) * 1000,
+            })
+
+
+@contextmanager
+def record_queries(recorder):
+    # On this thread's connections, like `django.test.utils.CaptureQueriesContext` but without forcing `DEBUG`
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield recorder
+
+
+def write_profile(directory, profiler, recorder, info, keep):
+    """
+    Write a profile as `<name>.folded` (collapsed stacks) and `<name>.json` (`info` and the queries), keeping only
+    the `keep` most recent profiles in `directory`. Returns the name.
+    """
+    os.makedirs(directory, exist_ok=True)
+    timestamp = time.strftime('%Y%m%dT%H%M%S')
+    name = f'{timestamp}-{secrets.token_hex(4)}'
+
+    with open(os.path.join(directory, f'{name}.folded'), 'w') as file:
+        profiler.write_collapsed(file)
+
+    query_time_ms = sum(query['duration_ms'] for query in recorder.queries)
+    summary = {
+        **info,
+        'samples': profiler.samples,
+        'interval_ms': profiler.interval * 1000,
+        'query_count': len(recorder.queries),
+        'query_time_ms': query_time_ms,
+        'queries': recorder.queries,
+    }
+    with open(os.path.join(directory, f'{name}.json'), 'w') as file:
+        json.dump(summary, file, indent=2)
+
+    prune_profiles(directory, keep)
+    return name
+
+
+def prune_profiles(directory, keep):
+    # Names start with a timestamp, so they sort oldest first
+    names = sorted(filename[:-len('.json')] for filename in os.listdir(directory) if filename.endswith('.json'))
+    for name in names[:max(len(names) - keep, 0)]:
+        for extension in ('.folded', '.json'):
+            try:
+                os.remove(os.path.join(directory, name + extension))
+            except FileNotFoundError:
+                # Pruned by another worker at the same time
+                pass
@@ -0,0 +1,65 @@
+import math
+from decimal import Decimal
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Types that are never NaN or infinite, skipped by their exact type as nearly all values are one of them
+FINITE_TYPES = {str, int, bool, type(None)}
+
+
+def has_non_finite_numbers(data):
+    # Whether NaN or infinity is among the values of `data`, including Decimals, which render as floats
+    stack = [[data]]
+    while stack:
+        container = stack.pop()
+        for value in container.values() if isinstance(container, dict) else container:
+            if type(value) in FINITE_TYPES:
+                continue
+            if isinstance(value, float):
+                if not math.isfinite(value):
+                    return True
+            elif isinstance(value, (dict, list, tuple)):
+                stack.append(value)
+            elif isinstance(value, Decimal) and not value.is_finite():
+                return True
+    return False
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for DRF's `JSONRenderer` built on orjson.
+
+    Types orjson does not handle natively (Decimal, lazy translation strings, timedelta, querysets, ...) go through
+    DRF's own `JSONEncoder.default`, and UTC datetimes keep DRF's `Z` suffix. The output parses to the same values
+    as the stdlib renderer's, though floats may be written differently (`1e20` rather than `1e+20`). Anything orjson
+    refuses outright, like integers wider than 64 bits, falls back to the stdlib renderer, and so does data holding
+    NaN or infinity, which orjson would write as `null` where the stdlib renderer raises `ValueError` (`STRICT_JSON`).
+    """
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+    default = staticmethod(JSONEncoder().default)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        options = self.options
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            # orjson only knows one indent width
+            options |= orjson.OPT_INDENT_2
+
+        try:
+            ret = orjson.dumps(data, default=self.default, option=options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # NaN and infinity come out as `null`, so only data rendering a `null` needs to be searched for them
+        if b'null' in ret and has_non_finite_numbers(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same as DRF: fully escape \u2028 and \u2029 so the output is a strict JavaScript subset
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+        return ret
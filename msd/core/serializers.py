@@ -0,0 +1,67 @@
+from pydantic import ValidationError as PydanticValidationError
+from pydantic_core import PydanticCustomError
+from rest_framework import serializers
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.settings import api_settings
+from rest_framework.utils import html
+
+# Type of the errors raised by `fail()`
+FIELD_ERRORS = 'field_errors'
+
+# Built-in pydantic error types and the DRF field error they stand for
+ERROR_CODES = {
+    'missing': 'required',
+    'string_type': 'invalid',
+    'string_too_short': 'blank',
+    'string_too_long': 'max_length',
+}
+FIELD_ERROR_MESSAGES = {**serializers.Field.default_error_messages, **serializers.CharField.default_error_messages}
+
+
+def fail(*details):
+    """
+    Raise from a pydantic validator to report DRF error details, `(message, code)` pairs, for the field as they are.
+    """
+    raise PydanticCustomError(FIELD_ERRORS, 'Invalid value', {'details': details})
+
+
+def get_error_details(error):
+    if error['type'] == FIELD_ERRORS:
+        return [ErrorDetail(str(message), code) for message, code in error['ctx']['details']]
+
+    if error['type'] == 'model_type':
+        message = serializers.Serializer.default_error_messages['invalid']
+        return [ErrorDetail(message.format(datatype=type(error['input']).__name__), 'invalid')]
+
+    code = ERROR_CODES.get(error['type'])
+    if code == 'invalid' and error['input'] is None:
+        code = 'null'
+    if code is None:
+        return [ErrorDetail(error['msg'], 'invalid')]
+    return [ErrorDetail(str(FIELD_ERROR_MESSAGES[code]).format(**error.get('ctx', {})), code)]
+
+
+class PydanticValidationMixin:
+    """
+    Validate the fields of a serializer with the pydantic model `schema` in one compiled pass, instead of running
+    every DRF field and its validators.
+
+    The schema must report errors like the fields it replaces: built-in string constraints are translated to the
+    messages of DRF's `CharField`, validators raise anything else with `fail()`. Only field validation is replaced,
+    `validate()`, `create()` and `update()` run as usual.
+    """
+    schema = None
+
+    def to_internal_value(self, data):
+        if html.is_html_input(data):
+            # Form data, where DRF's fields take the last value of each key
+            data = {key: data.get(key) for key in data}
+
+        try:
+            return self.schema.model_validate(data).model_dump(exclude_unset=True)
+        except PydanticValidationError as ex:
+            errors = {}
+            for error in ex.errors(include_url=False):
+                field = error['loc'][0] if error['loc'] else api_settings.NON_FIELD_ERRORS_KEY
+                errors.setdefault(field, []).extend(get_error_details(error))
+            raise serializers.ValidationError(errors)
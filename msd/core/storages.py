@@ -0,0 +1,23 @@
+import re
+
+from storages.backends.s3 import S3ManifestStaticStorage
+
+# `name.<first 12 hex digits of the MD5>.ext`, as named by `ManifestFilesMixin.hashed_name()`
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}(\.[^/.]+)?$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+class ManifestS3Storage(S3ManifestStaticStorage):
+    """
+    django-storages' `S3ManifestStaticStorage`, whose copies of static files under content hashed names are cached
+    for good.
+
+    The content behind a hashed name never changes, so those copies are cached by browsers and CDNs for a year
+    without ever being revalidated. The unhashed copies and the manifest keep the configured `CacheControl`.
+    """
+
+    def get_object_parameters(self, name):
+        parameters = super().get_object_parameters(name)
+        if HASHED_NAME.search(name):
+            parameters['CacheControl'] = IMMUTABLE_CACHE_CONTROL
+        return parameters
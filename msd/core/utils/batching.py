@@ -0,0 +1,54 @@
+import time
+from contextlib import contextmanager
+
+from django.db import connections, transaction
+
+
+def iterate_pk_batches(queryset, batch_size):
+    """
+    Yield lists of primary keys of `queryset` in ascending order, `batch_size` at a time.
+
+    Uses keyset pagination (`pk > last_pk`) rather than offsets, so every batch is a short index range scan no
+    matter how deep into the table it is, and rows deleted or changed by earlier batches don't shift later ones.
+    """
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    while True:
+        batch_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        pks = list(batch_queryset.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return
+
+        yield pks
+        last_pk = pks[-1]
+
+
+@contextmanager
+def short_transaction(lock_timeout='2s', using='default'):
+    # Give up on a batch instead of queueing behind (and in front of) other writers when a lock is contended
+    with transaction.atomic(using=using):
+        connection = connections[using]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL lock_timeout = %s', [lock_timeout])
+
+        yield
+
+
+def get_replication_lag(using='default'):
+    # Seconds the slowest streaming replica is behind, 0 when there are none or they are not visible to us
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return 0.0
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT COALESCE(EXTRACT(EPOCH FROM MAX(replay_lag)), 0) FROM pg_stat_replication')
+        return float(cursor.fetchone()[0])
+
+
+def throttle(sleep, max_replication_lag=None, using='default'):
+    time.sleep(sleep)
+
+    if max_replication_lag is not None:
+        while get_replication_lag(using) > max_replication_lag:
+            time.sleep(max(sleep, 1))
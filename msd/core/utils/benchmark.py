@@ -0,0 +1,121 @@
+import json
+import math
+import platform
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+BENCHMARKS = {}
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def benchmark(name):
+    """
+    Register a benchmark scenario under `name`.
+
+    The decorated function is a generator: everything before its single `yield` is setup, the yielded
+    zero-argument callable is what gets timed and everything after the `yield` is teardown.
+    """
+
+    def decorator(func):
+        BENCHMARKS[name] = contextmanager(func)
+        return func
+
+    return decorator
+
+
+def percentile(sorted_samples, pct):
+    # Nearest-rank percentile, good enough for latency reporting and stable between runs
+    if not sorted_samples:
+        return 0.0
+
+    rank = max(math.ceil(pct / 100 * len(sorted_samples)), 1)
+    return sorted_samples[rank - 1]
+
+
+def measure(func, iterations, warmup=0):
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        iteration_started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - iteration_started)
+    elapsed = time.perf_counter() - started
+
+    samples.sort()
+    return {
+        'iterations': iterations,
+        'throughput': iterations / elapsed if elapsed else 0.0,
+        'mean_ms': sum(samples) / len(samples) * 1000 if samples else 0.0,
+        'min_ms': samples[0] * 1000 if samples else 0.0,
+        'max_ms': samples[-1] * 1000 if samples else 0.0,
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+    }
+
+
+def run_benchmarks(names, iterations, warmup=0):
+    results = {}
+    for name in names:
+        try:
+            scenario = BENCHMARKS[name]
+        except KeyError:
+            raise BenchmarkError(f'Unknown benchmark: {name}')
+
+        with scenario() as func:
+            results[name] = measure(func, iterations, warmup=warmup)
+
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Return a list of human readable regressions of `results` against `baseline`.
+
+    A scenario regresses when its p95 latency grows or its throughput drops by more than `tolerance`
+    (a fraction, e.g. 0.2 for 20%). Scenarios missing from the baseline are ignored.
+    """
+    regressions = []
+    for name, stats in results.items():
+        baseline_stats = baseline.get(name)
+        if not baseline_stats:
+            continue
+
+        if stats['p95_ms'] > baseline_stats['p95_ms'] * (1 + tolerance):
+            regressions.append(f'{name}: p95 {stats["p95_ms"]:.2f}ms > baseline {baseline_stats["p95_ms"]:.2f}ms')
+
+        if stats['throughput'] < baseline_stats['throughput'] * (1 - tolerance):
+            regressions.append(
+                f'{name}: throughput {stats["throughput"]:.1f}/s < baseline {baseline_stats["throughput"]:.1f}/s'
+            )
+
+    return regressions
+
+
+def make_report(results, **metadata):
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        **metadata,
+        'results': results,
+    }
+
+
+def load_report(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_report(report, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+        file.write('\n')
@@ -0,0 +1,37 @@
+import math
+
+
+class BloomFilter:
+    """
+    Set membership with false positives but no false negatives, in a fixed amount of memory.
+
+    Positions are derived from Python's built-in `hash()` (double hashing on its two 32-bit halves) which is
+    randomized per interpreter, so a filter is only meaningful inside the process that built it and must never be
+    persisted or shared. In exchange a lookup costs one string hash plus, for absent items, usually a single probe.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.size = max(math.ceil(-capacity * math.log(error_rate) / math.log(2)**2), 8)
+        self.hash_count = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        value = hash(item)
+        first = value & 0xFFFFFFFF
+        second = (value >> 32) & 0xFFFFFFFF | 1
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.size
+
+    def add(self, item):
+        bits = self.bits
+        for position in self._positions(item):
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        bits = self.bits
+        for position in self._positions(item):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+
+        return True
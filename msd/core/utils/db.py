@@ -0,0 +1,127 @@
+import json
+
+from django.db import connections
+from django.db.models import F
+
+
+def estimate_count(queryset):
+    """
+    Return the PostgreSQL planner's estimate of the number of rows in `queryset`, or None on other databases.
+
+    The estimate comes from table statistics (`pg_class.reltuples` and column histograms) kept fresh by autovacuum,
+    so it costs a planning round trip instead of the full scan an exact `COUNT(*)` needs.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def estimate_table_rows(table, using='default'):
+    """
+    Return the number of rows in `table` as of its last `ANALYZE` on PostgreSQL, 0 if it does not exist, or None on
+    other databases.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        # `reltuples` is -1 for tables never analyzed
+        cursor.execute(
+            'SELECT GREATEST(reltuples, 0) FROM pg_class WHERE oid = to_regclass(%s)',
+            [connection.ops.quote_name(table)]
+        )
+        row = cursor.fetchone()
+    return int(row[0]) if row else 0
+
+
+def insert_or_get(model, objs, conflict_field, using='default'):
+    """
+    Insert `objs` with a single `INSERT ... ON CONFLICT` statement and return a `(obj, created)` pair per row.
+
+    Rows whose `conflict_field` (which must be unique) is already taken are not inserted, the existing row is
+    returned instead. The conflict is resolved by a no-op update rather than `DO NOTHING` because only then does
+    `RETURNING` include the existing row, in the same round trip and without a race between a `SELECT` and the
+    `INSERT`. Whether a row was inserted is told by its `xmax`, which is 0 for freshly inserted row versions.
+
+    `objs` must have distinct `conflict_field` values. Pairs come back in no particular order. Only for PostgreSQL
+    and models without multi-table inheritance parents. Like `bulk_create()`, `save()` and its signals are skipped.
+    """
+    objs = list(objs)
+    if not objs:
+        return []
+
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    opts = model._meta
+    fields = [field for field in opts.concrete_fields if not field.primary_key]
+    column = quote_name(opts.get_field(conflict_field).column)
+
+    params = []
+    for obj in objs:
+        params.extend(field.get_db_prep_save(field.pre_save(obj, True), connection) for field in fields)
+
+    columns = ', '.join(quote_name(field.column) for field in fields)
+    returning = ', '.join(quote_name(field.column) for field in opts.concrete_fields)
+    values = ', '.join(['(' + ', '.join(['%s'] * len(fields)) + ')'] * len(objs))
+    sql = (
+        f'INSERT INTO {quote_name(opts.db_table)} ({columns}) VALUES {values} '
+        f'ON CONFLICT ({column}) DO UPDATE SET {column} = EXCLUDED.{column} RETURNING {returning}, xmax = 0'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    field_names = [field.attname for field in opts.concrete_fields]
+    return [(model.from_db(using, field_names, row[:-1]), row[-1]) for row in rows]
+
+
+def increment_counters(model, counts, key_fields, count_field, using='default'):
+    """
+    Add `counts`, a mapping of `key_fields` value tuples to amounts, to `count_field` of the matching rows.
+
+    Missing rows are created. On PostgreSQL this is a single `INSERT ... ON CONFLICT DO UPDATE` statement, which
+    needs a unique constraint on `key_fields`. Rows are written in key order, so that transactions incrementing
+    overlapping rows lock them in the same order instead of deadlocking.
+    """
+    counts = sorted((key, amount) for key, amount in counts.items() if amount)
+    if not counts:
+        return
+
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        manager = model._default_manager.using(using)
+        for key, amount in counts:
+            lookup = dict(zip(key_fields, key))
+            if not manager.filter(**lookup).update(**{count_field: F(count_field) + amount}):
+                manager.create(**lookup, **{count_field: amount})
+        return
+
+    quote_name = connection.ops.quote_name
+    opts = model._meta
+    fields = [opts.get_field(name) for name in (*key_fields, count_field)]
+
+    params = []
+    for key, amount in counts:
+        params.extend(field.get_db_prep_save(value, connection) for field, value in zip(fields, (*key, amount)))
+
+    table = quote_name(opts.db_table)
+    columns = ', '.join(quote_name(field.column) for field in fields)
+    key_columns = ', '.join(quote_name(field.column) for field in fields[:-1])
+    count_column = quote_name(fields[-1].column)
+    values = ', '.join(['(' + ', '.join(['%s'] * len(fields)) + ')'] * len(counts))
+    sql = (
+        f'INSERT INTO {table} ({columns}) VALUES {values} '
+        f'ON CONFLICT ({key_columns}) DO UPDATE SET {count_column} = {table}.{count_column} + EXCLUDED.{count_column}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
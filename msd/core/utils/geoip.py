@@ -0,0 +1,126 @@
+import ipaddress
+import mmap
+import os
+import struct
+from decimal import Decimal
+from typing import NamedTuple, Optional
+
+MAGIC = b'MSDGEO\x00\x01'
+HEADER = struct.Struct('<8sII')  # magic, range count, location count
+RANGE = struct.Struct('<16s16siiI')  # first address, last address, latitude, longitude, location index
+COORDINATE_SCALE = 100  # Coordinates are stored as integer hundredths of a degree (about 1 km)
+NO_COORDINATE = -2**31
+
+
+class GeoLocation(NamedTuple):
+    location: str
+    latitude: Optional[Decimal]
+    longitude: Optional[Decimal]
+
+
+def to_key(address):
+    """
+    Return the 16 byte big-endian key of an `ipaddress` address, IPv4 addresses in their IPv4-mapped IPv6 form.
+
+    Keys of both families share a single sorted space and compare as bytes in the same order as the addresses.
+    """
+    value = int(address)
+    if address.version == 4:
+        value |= 0xffff << 32
+    return value.to_bytes(16, 'big')
+
+
+def encode_coordinate(value):
+    return NO_COORDINATE if value is None else round(Decimal(value) * COORDINATE_SCALE)
+
+
+def decode_coordinate(value):
+    return None if value == NO_COORDINATE else Decimal(value).scaleb(-2)
+
+
+def write_ip_range_database(path, ranges):
+    """
+    Write `ranges`, an iterable of `(first_ip, last_ip, location, latitude, longitude)`, to a database file.
+
+    The file is written next to `path` and moved into place, so processes that still have the old file mapped keep
+    reading it undisturbed. Returns the number of ranges written.
+
+    Raises:
+        ValueError: If an address is invalid, a range is reversed or ranges overlap.
+    """
+    locations = {}
+    records = []
+    for first_ip, last_ip, location, latitude, longitude in ranges:
+        first, last = to_key(ipaddress.ip_address(first_ip)), to_key(ipaddress.ip_address(last_ip))
+        if first > last:
+            raise ValueError(f'Range {first_ip} - {last_ip} is reversed')
+
+        index = locations.setdefault(location, len(locations))
+        records.append((first, last, encode_coordinate(latitude), encode_coordinate(longitude), index))
+
+    records.sort()
+    for previous, record in zip(records, records[1:]):
+        if record[0] <= previous[1]:
+            raise ValueError(f'Range starting at {ipaddress.ip_address(record[0])} overlaps the previous one')
+
+    temporary_path = f'{path}.tmp'
+    with open(temporary_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, len(records), len(locations)))
+        for record in records:
+            file.write(RANGE.pack(*record))
+        file.write('\n'.join(locations).encode())
+    os.replace(temporary_path, path)
+
+    return len(records)
+
+
+class IPRangeDatabase:
+    """
+    Read-only IP range to location database, memory-mapped from a file built by `write_ip_range_database`.
+
+    Ranges are fixed-size records sorted by first address, so a lookup is a binary search over the mapped file
+    that touches a handful of pages and allocates nothing beyond the result. The OS page cache shares the file
+    between worker processes. Only the (much smaller) location name table is loaded into memory.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count, location_count = HEADER.unpack_from(self.mmap)
+        if magic != MAGIC:
+            self.mmap.close()
+            raise ValueError(f'{path} is not an IP range database')
+
+        self.locations = self.mmap[HEADER.size + self.count * RANGE.size:].decode().split('\n')[:location_count]
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, address):
+        """
+        Return the `GeoLocation` of an `ipaddress` address, or None if no range contains it.
+        """
+        key = to_key(address)
+
+        # Find the last range whose first address is <= key
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            offset = HEADER.size + middle * RANGE.size
+            if self.mmap[offset:offset + 16] <= key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low == 0:
+            return None
+
+        _, last, latitude, longitude, index = RANGE.unpack_from(self.mmap, HEADER.size + (low - 1) * RANGE.size)
+        if key > last:
+            return None
+
+        return GeoLocation(self.locations[index], decode_coordinate(latitude), decode_coordinate(longitude))
+
+    def close(self):
+        self.mmap.close()
@@ -0,0 +1,158 @@
+"""
+Ed25519-signed JSON Web Tokens (RFC 7515 compact serialization, RFC 8037 `EdDSA`) and key sets (RFC 7517).
+
+Only PyNaCl and the standard library are used, so other services can copy this module and verify our tokens
+locally with `KeySetClient` instead of calling `jwt/verify/`.
+"""
+import base64
+import hashlib
+import json
+import threading
+import time
+import urllib.request
+
+from nacl.bindings import crypto_sign_BYTES
+from nacl.exceptions import BadSignatureError
+from nacl.signing import SigningKey, VerifyKey
+
+ALGORITHM = 'EdDSA'
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def b64decode(data):
+    data = data.encode('ascii')
+    return base64.urlsafe_b64decode(data + b'=' * (-len(data) % 4))
+
+
+def dump_json(data, json_encoder=None):
+    return json.dumps(data, separators=(',', ':'), cls=json_encoder).encode()
+
+
+def load_signing_key(seed):
+    # Keys are configured as their base64 encoded 32 byte seed
+    return SigningKey(base64.b64decode(seed))
+
+
+def get_key_id(verify_key):
+    # The RFC 7638 thumbprint, so key ids never need to be configured and can't collide
+    members = {'crv': 'Ed25519', 'kty': 'OKP', 'x': b64encode(bytes(verify_key))}
+    return b64encode(hashlib.sha256(json.dumps(members, separators=(',', ':'), sort_keys=True).encode()).digest())
+
+
+def to_jwk(verify_key):
+    return {
+        'kty': 'OKP',
+        'crv': 'Ed25519',
+        'x': b64encode(bytes(verify_key)),
+        'kid': get_key_id(verify_key),
+        'use': 'sig',
+        'alg': ALGORITHM,
+    }
+
+
+def from_jwks(jwks):
+    # Keys of other types or uses are skipped, a key set may hold more than ours
+    return {
+        jwk['kid']: VerifyKey(b64decode(jwk['x']))
+        for jwk in jwks['keys']
+        if jwk.get('kty') == 'OKP' and jwk.get('crv') == 'Ed25519' and jwk.get('use', 'sig') == 'sig'
+    }
+
+
+def encode(payload, signing_key, json_encoder=None):
+    header = {'alg': ALGORITHM, 'typ': 'JWT', 'kid': get_key_id(signing_key.verify_key)}
+    signing_input = f'{b64encode(dump_json(header))}.{b64encode(dump_json(payload, json_encoder))}'
+    signature = signing_key.sign(signing_input.encode('ascii')).signature
+    return f'{signing_input}.{b64encode(signature)}'
+
+
+def get_header(token):
+    try:
+        header = json.loads(b64decode(token.split('.', 1)[0]))
+    except ValueError as error:
+        raise InvalidToken('Malformed token') from error
+    if not isinstance(header, dict):
+        raise InvalidToken('Malformed token')
+    return header
+
+
+def decode(token, verify_keys, leeway=0, verify=True):
+    """
+    Return the payload of `token`, raising InvalidToken unless it is signed by one of `verify_keys` (a mapping of
+    key ids to `VerifyKey`) and has an `exp` claim that has not passed more than `leeway` seconds ago.
+    """
+    try:
+        header_segment, payload_segment, signature_segment = token.split('.')
+        payload = json.loads(b64decode(payload_segment))
+        signature = b64decode(signature_segment)
+    except ValueError as error:
+        raise InvalidToken('Malformed token') from error
+    # PyNaCl raises ValueError rather than BadSignatureError for signatures of the wrong length
+    if not isinstance(payload, dict) or len(signature) != crypto_sign_BYTES:
+        raise InvalidToken('Malformed token')
+    if not verify:
+        return payload
+
+    header = get_header(token)
+    if header.get('alg') != ALGORITHM:
+        raise InvalidToken('Unexpected algorithm')
+    verify_key = verify_keys.get(header.get('kid'))
+    if verify_key is None:
+        raise InvalidToken('Unknown key')
+    try:
+        verify_key.verify(f'{header_segment}.{payload_segment}'.encode('ascii'), signature)
+    except BadSignatureError as error:
+        raise InvalidToken('Bad signature') from error
+
+    exp = payload.get('exp')
+    if not isinstance(exp, (int, float)) or exp <= time.time() - leeway:
+        raise InvalidToken('Token has expired')
+    return payload
+
+
+class KeySetClient:
+    """
+    Verify tokens against the key set published at `url`, e.g. `https://.../api/jwt/keys/`.
+
+    The key set is fetched again after `max_age` seconds, and early (at most every `min_refresh_interval` seconds)
+    when a token names a key id not seen yet, which is how newly rotated keys are picked up. Revocation is not
+    checked, a revoked access token is accepted until its `exp`, so keep access tokens short-lived.
+    """
+
+    def __init__(self, url, max_age=5 * 60, min_refresh_interval=30, leeway=0, timeout=5):
+        self.url = url
+        self.max_age = max_age
+        self.min_refresh_interval = min_refresh_interval
+        self.leeway = leeway
+        self.timeout = timeout
+        self.keys = {}
+        self.fetched_at = None
+        self.lock = threading.Lock()
+
+    def fetch(self):
+        with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+            self.keys = from_jwks(json.load(response))
+        self.fetched_at = time.monotonic()
+
+    def get_keys(self, kid):
+        with self.lock:
+            age = None if self.fetched_at is None else time.monotonic() - self.fetched_at
+            if age is None or age > self.max_age or (kid not in self.keys and age > self.min_refresh_interval):
+                self.fetch()
+            return self.keys
+
+    def verify(self, token, token_type='access'):
+        """
+        Return the payload of a valid, unexpired `token` of `token_type` (any type if None), or raise InvalidToken.
+        """
+        payload = decode(token, self.get_keys(get_header(token).get('kid')), self.leeway)
+        if token_type is not None and payload.get('token_type') != token_type:
+            raise InvalidToken('Unexpected token type')
+        return payload
@@ -0,0 +1,35 @@
+import re
+from functools import lru_cache
+
+FORMATTING_CHARACTERS = re.compile(r'[\s().\-/]')
+E164_MAX_DIGITS = 15
+E164_MIN_DIGITS = 8
+
+
+@lru_cache(maxsize=4096)
+def normalize_e164(number, default_country_code, national_number_length):
+    """
+    Return `number` in E.164 format (`+` and up to 15 digits), raising ValueError if it can't be one.
+
+    Numbers starting with `+` or the `00` international prefix carry their country code. Other numbers of at most
+    `national_number_length` digits, after dropping a `0` trunk prefix, are national numbers of
+    `default_country_code`, longer ones are taken to already start with a country code. This only normalizes the
+    format, it does not know each country's numbering plan.
+    """
+    number = FORMATTING_CHARACTERS.sub('', number)
+
+    if number.startswith('+'):
+        digits = number[1:]
+    elif number.startswith('00'):
+        digits = number[2:]
+    else:
+        digits = number[1:] if number.startswith('0') else number
+        if len(digits) <= national_number_length:
+            digits = default_country_code + digits
+
+    if not digits.isdigit() or not digits.isascii():
+        raise ValueError('A phone number can only contain digits, a leading + and formatting characters')
+    if digits.startswith('0') or not E164_MIN_DIGITS <= len(digits) <= E164_MAX_DIGITS:
+        raise ValueError('Not a valid international phone number')
+
+    return f'+{digits}'
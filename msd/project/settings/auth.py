@@ -11,32 +11,38 @@ AUTH_COOKIE_HTTP_ONLY = True
 AUTH_COOKIE_PATH = '/'
 AUTH_COOKIE_SAMESITE = 'None'
 
+SIMPLE_JWT = {
+    # Every refresh issues a new refresh token and revokes the old one (see `msd.users.revocation`)
+    'ROTATE_REFRESH_TOKENS': True,
+}
+
 # Djoser Settings
 
 DJOSER = {
-    'PASSWORD_RESET_CONFIRM_URL':
-        'forgot-password-reset/{uid}/{token}',
-    'SEND_ACTIVATION_EMAIL':
-        True,
-    'SEND_CONFIRMATION_EMAIL':
-        True,
-    'PASSWORD_CHANGED_EMAIL_CONFIRMATION':
-        True,
-    'ACTIVATION_URL':
-        'activation/{uid}/{token}',
-    'USER_CREATE_PASSWORD_RETYPE':
-        True,
-    'SET_PASSWORD_RETYPE':
-        True,
-    'PASSWORD_RESET_CONFIRM_RETYPE':
-        True,
-    'TOKEN_MODEL':
-        None,
+    'PASSWORD_RESET_CONFIRM_URL': 'forgot-password-reset/{uid}/{token}',
+    'SEND_ACTIVATION_EMAIL': True,
+    'SEND_CONFIRMATION_EMAIL': True,
+    'PASSWORD_CHANGED_EMAIL_CONFIRMATION': True,
+    'ACTIVATION_URL': 'activation/{uid}/{token}',
+    'USER_CREATE_PASSWORD_RETYPE': True,
+    'SET_PASSWORD_RETYPE': True,
+    'PASSWORD_RESET_CONFIRM_RETYPE': True,
+    'TOKEN_MODEL': None,
     'SOCIAL_AUTH_ALLOWED_REDIRECT_URIS': [
         'https://mysillydreams.com/auth/google', 'https://mysillydreams.com/auth/facebook'
-    ]
+    ],
+    # Signup fields are validated by a pydantic model (see `msd.users.schemas`)
+    'SERIALIZERS': {
+        'user_create_password_retype': 'msd.users.serializers.UserCreatePasswordRetypeSerializer'
+    },
 }
 
+# Outbound provider calls (see `msd.users.social`)
+
+SOCIAL_AUTH_REQUESTS_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+SOCIAL_AUTH_HTTP_POOL_CONNECTIONS = 4  # Number of providers to keep a connection pool for
+SOCIAL_AUTH_HTTP_POOL_MAXSIZE = 4  # Keep-alive connections kept per provider
+
 # Google Authentication
 
 SOCIAL_AUTH_GOOGLE_OAUTH2_KEY = os.getenv('SOCIAL_AUTH_GOOGLE_OAUTH2_KEY')
@@ -52,3 +58,9 @@ SOCIAL_AUTH_FACEBOOK_KEY = os.getenv('SOCIAL_AUTH_FACEBOOK_KEY')
 SOCIAL_AUTH_FACEBOOK_SECRET = os.getenv('SOCIAL_AUTH_FACEBOOK_SECRET')
 SOCIAL_AUTH_FACEBOOK_SCOPE = ['email']
 SOCIAL_AUTH_FACEBOOK_PROFILE_EXTRA_PARAMS = {'fields': 'email, first_name, last_name'}
+
+# Fake Authentication (`DEV_MODE` only)
+
+SOCIAL_AUTH_FAKE_OAUTH2_BASE_URL = 'http://127.0.0.1:8001'
+SOCIAL_AUTH_FAKE_OAUTH2_KEY = 'fake-key'
+SOCIAL_AUTH_FAKE_OAUTH2_SECRET = 'fake-secret'
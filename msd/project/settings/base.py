@@ -40,14 +40,17 @@ INSTALLED_APPS = [
     'msd.users',
 ]
 
+# Session, CSRF, auth and messages middleware are skipped for JWT authenticated API requests, see
+# `msd.core.middleware` and `LEAN_API_PATHS`
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'msd.core.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'msd.core.middleware.CsrfViewMiddleware',
+    'msd.core.middleware.AuthenticationMiddleware',
+    'msd.core.middleware.ProfilingMiddleware',
+    'msd.core.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -99,6 +102,10 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Throttle counters must live in a cache shared by all workers: deployments override this with Redis through
+# `MSDSETTINGS_CACHES` (see docker-compose.yml)
+CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -112,10 +119,19 @@ if DEV_MODE:
     MEDIA_ROOT = BASE_DIR / 'media'  # type: ignore # noqa: F821
     STATIC_URL = '/static/'
     STATIC_ROOT = BASE_DIR / 'staticfiles'  # type: ignore # noqa: F821
+    STORAGES = {
+        'default': {
+            'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        },
+        'staticfiles': {
+            'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+        },
+    }
 else:
     STORAGES = {
         'staticfiles': {
-            'BACKEND': 'storages.backends.s3.S3Storage',
+            # Content hashed file names, cached for good (see `msd.core.storages`)
+            'BACKEND': 'msd.core.storages.ManifestS3Storage',
             'OPTIONS': {
                 'access_key': '',
                 'secret_key': '',
@@ -124,6 +140,7 @@ else:
                 'querystring_auth': False,
                 'endpoint_url': 'https://s3.ap-south-2.amazonaws.com',
                 'location': 'static',
+                'gzip': True,  # Text assets are stored compressed, every browser accepts gzip
                 'object_parameters': {
                     'CacheControl': 'max-age=86400'
                 },
@@ -135,16 +152,47 @@ else:
     MEDIA_URL = f'https://{STORAGES["staticfiles"]["OPTIONS"]["bucket_name"]}.s3.{STORAGES["staticfiles"]["OPTIONS"]["region_name"]}.amazonaws.com/media/'  # type: ignore # noqa: E501
 
 AUTHENTICATION_BACKENDS = [
-    'social_core.backends.google.GoogleOAuth2',
-    'social_core.backends.facebook.FacebookOAuth2',
+    'msd.users.social.GoogleOAuth2',
+    'msd.users.social.FacebookOAuth2',
     # 'social_core.backends.apple.AppleIdAuth',
     # 'social_core.backends.instagram.InstagramOAuth2',
+    'msd.users.backends.MobileOTPBackend',
     'django.contrib.auth.backends.ModelBackend',
 ]
 
+if DEV_MODE:
+    # Local fake provider for tests and benchmarks, see `msd.users.fake_oauth`
+    AUTHENTICATION_BACKENDS.append('msd.users.social.FakeOAuth2')
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': ['msd.users.authentication.CustomJWTAuthentication'],
-    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated']
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated'],
+    'DEFAULT_RENDERER_CLASSES': [
+        'msd.core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'msd.core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Number of trusted proxies in front of the app, which decides the client address that throttling and
+    # geolocation use. 0 takes the connection's address. Behind a load balancer, set it to the proxy depth, e.g.
+    # `MSDSETTINGS_REST_FRAMEWORK='{"NUM_PROXIES": 1}'`. Never use None: DRF would then trust any `X-Forwarded-For`
+    # header a client sends.
+    'NUM_PROXIES': 0,
+    'DEFAULT_THROTTLE_RATES': {
+        # Login: `jwt/create/`
+        'login_ip': '20/min',
+        'login_identity': '10/min',
+        'login_global': '1000/min',
+        # Registration, activation and password reset, each of them sends an email/OTP
+        'otp_ip': '10/hour',
+        'otp_identity': '5/hour',
+        'otp_global': '300/min',
+        # Token introspection: `jwt/introspect/`, per request of up to `TOKEN_INTROSPECTION_MAX_TOKENS` tokens
+        'introspection_ip': '600/min',
+    },
 }
 
 # Default primary key field type
@@ -3,3 +3,78 @@ Settings specific to this application only (NO DJANGO or THIRD-PARTY SETTINGS)
 """
 
 IN_DOCKER = False
+
+# Request paths that skip browser-only middleware (see `msd.core.middleware`)
+LEAN_API_PATHS = ['/api/']
+LEAN_API_EXCLUDED_PATHS = ['/api/o/']  # Social login keeps its OAuth state in the session
+
+# Token revocation (see `msd.users.revocation`)
+TOKEN_REVOCATION_REBUILD_INTERVAL = 30  # seconds, upper bound for other workers to notice a revoked token
+TOKEN_REVOCATION_PRUNE_INTERVAL = 60 * 60  # seconds
+TOKEN_REVOCATION_BLOOM_CAPACITY = 100_000
+TOKEN_REVOCATION_ERROR_RATE = 0.001
+
+# Batch token introspection for gateways, `api/jwt/introspect/` (see `msd.users.introspection`)
+TOKEN_INTROSPECTION_MAX_TOKENS = 1000
+TOKEN_INTROSPECTION_CACHE_SIZE = 10_000  # Verified tokens kept per process
+
+# Users and rendered profiles cached by `CustomJWTAuthentication` and `api/users/me/`, invalidated on save
+USER_CACHE_TIMEOUT = 5 * 60  # seconds, also bounds staleness after bulk updates that bypass `save()`
+
+# Offline IP geolocation of users at signup and login (see `msd.users.geolocation`)
+GEOIP_DATABASE_PATH = BASE_DIR / 'local' / 'geoip.db'  # type: ignore # noqa: F821
+GEOIP_CACHE_SIZE = 10_000  # Resolved addresses kept per process
+
+# Transactional outbox of user lifecycle events, drained by the `relay_outbox` command (see `msd.users.outbox`)
+OUTBOX_SINK = 'msd.users.outbox.FileSink'
+OUTBOX_SINK_OPTIONS = {'path': str(BASE_DIR / 'local' / 'outbox.jsonl')}  # type: ignore # noqa: F821
+OUTBOX_BATCH_SIZE = 500
+OUTBOX_POLL_INTERVAL = 1  # seconds
+
+# Role groups every user with the flag belongs to, `None` meaning everyone (see `msd.users.roles`)
+USER_ROLE_GROUPS = [
+    ('Normal User', None),
+    ('Vendor User', 'is_vendor'),
+    ('Staff User', 'is_staff'),
+]
+PERMISSIONS_IN_TOKEN = True  # Carry the compiled permission mask in access tokens, saving a cache lookup per request
+
+# Mobile numbers are stored in E.164 format, national numbers (at most this many digits) get the default country code
+MOBILE_DEFAULT_COUNTRY_CODE = '91'
+MOBILE_NATIONAL_NUMBER_LENGTH = 10
+
+# One-time codes for mobile number login (see `msd.users.backends.MobileOTPBackend`)
+VERIFICATION_CODE_LIFETIME = 5 * 60  # seconds
+SMS_BACKEND = 'msd.users.sms.ConsoleSMSBackend'
+SMS_BACKEND_OPTIONS = {}
+
+# Batch registration for partner integrations, `api/users/batch/` (see `msd.users.registration`)
+BATCH_REGISTRATION_MAX_USERS = 5000
+BATCH_REGISTRATION_CHUNK_SIZE = 1000  # Users inserted per statement and transaction
+
+# On-demand request profiling of staff requests with an `X-Profile` header (see `msd.core.middleware`)
+PROFILING_ENABLED = True
+PROFILING_SAMPLE_RATE = 0  # Fraction of all other requests to profile
+PROFILING_INTERVAL = 0.001  # seconds between stack samples
+PROFILING_DIRECTORY = str(BASE_DIR / 'local' / 'profiles')  # type: ignore # noqa: F821
+PROFILING_MAX_PROFILES = 100  # Older ones are deleted
+
+# Logins are recorded in `last_login` in bulk, at most this many seconds late, 0 for right away (see
+# `msd.users.activity`)
+ACTIVITY_FLUSH_INTERVAL = 10
+
+# Ed25519 keys signing JWTs, as base64 encoded 32 byte seeds, empty to sign with HMAC and `SECRET_KEY` (see
+# `msd.users.signing`). The first key signs and all are published at `api/jwt/keys/`: add a new key second, move it
+# first once services have refetched the key set (`JWT_KEY_SET_MAX_AGE`), drop the old one when its tokens expired.
+JWT_SIGNING_KEYS = []
+JWT_ACCEPT_HMAC_TOKENS = True  # Tokens issued before switching to Ed25519, turn off once they have all expired
+JWT_KEY_SET_MAX_AGE = 5 * 60  # seconds
+
+# User rollups, signups append deltas which the `fold_user_rollups` command adds to the rollups (see
+# `msd.users.rollups`)
+ROLLUP_FOLD_BATCH_SIZE = 10_000
+ROLLUP_FOLD_INTERVAL = 5  # seconds
+
+# Unapplied migrations that would lock tables of at least this many rows fail the `migrate` checks (see
+# `msd.core.checks` and `msd.core.operations`)
+MIGRATION_LARGE_TABLE_ROWS = 100_000
@@ -2,3 +2,16 @@ if IN_DOCKER:  # type: ignore  # noqa: F821 # Ignoring "type" coz import is not
     assert MIDDLEWARE[:1] == [  # type: ignore # noqa: F821
         'django.middleware.security.SecurityMiddleware'
     ]
+
+    # Static files are served by the app itself, with content hashed names and compressed with gzip and brotli by
+    # `collectstatic`, so no request for them reaches Django's URL resolution or has to compress on the fly
+    MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')  # type: ignore # noqa: F821
+    STORAGES = {  # type: ignore # noqa: F821
+        **STORAGES,  # type: ignore # noqa: F821
+        'staticfiles': {
+            'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+        },
+    }
+    STATIC_URL = '/static/'
+    STATIC_ROOT = BASE_DIR / 'staticfiles'  # type: ignore # noqa: F821
+    WHITENOISE_KEEP_ONLY_HASHED_FILES = True
@@ -3,6 +3,5 @@ from django.urls import include, path
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/', include('djoser.urls')),
     path('api/', include('msd.users.urls')),
 ]
@@ -0,0 +1,117 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import UserAccount
+
+logger = logging.getLogger(__name__)
+
+# Rows per UPDATE statement
+FLUSH_BATCH_SIZE = 1000
+
+
+def write_last_logins(last_logins):
+    """
+    Set `last_login` of many users from a mapping of user ids to timestamps, never moving one backwards.
+
+    On PostgreSQL every `FLUSH_BATCH_SIZE` users are written with a single `UPDATE ... FROM (VALUES ...)`, which
+    goes around `save()`: it is bookkeeping that other services, caches and rollups don't need to hear about.
+    """
+    using = router.db_for_write(UserAccount)
+    connection = connections[using]
+    # In id order, so that concurrent flushes lock rows in the same order instead of deadlocking
+    items = sorted(last_logins.items())
+
+    if connection.vendor != 'postgresql':
+        users = UserAccount.objects.using(using)
+        for user_id, last_login in items:
+            users.filter(Q(last_login__isnull=True) | Q(last_login__lt=last_login),
+                         pk=user_id).update(last_login=last_login)
+        return
+
+    quote_name = connection.ops.quote_name
+    table = quote_name(UserAccount._meta.db_table)
+    pk_column = quote_name(UserAccount._meta.pk.column)
+    column = quote_name(UserAccount._meta.get_field('last_login').column)
+    with connection.cursor() as cursor:
+        for start in range(0, len(items), FLUSH_BATCH_SIZE):
+            batch = items[start:start + FLUSH_BATCH_SIZE]
+            values = ', '.join(['(%s, %s::timestamptz)'] * len(batch))
+            cursor.execute(
+                f'UPDATE {table} SET {column} = v.last_login FROM (VALUES {values}) AS v (id, last_login) '
+                f'WHERE {table}.{pk_column} = v.id AND ({table}.{column} IS NULL OR {table}.{column} < v.last_login)',
+                [value for item in batch for value in item],
+            )
+
+
+class ActivityBuffer:
+    """
+    Buffer users' activity timestamps in memory and write them in bulk at most `interval` seconds later.
+
+    Recording a login is a dict assignment instead of an UPDATE of the wide user row, and a user seen many times
+    within an interval is written once. A flush is scheduled by the first timestamp recorded after the previous
+    one, so idle processes have no timer running. What is still buffered is flushed when the process exits. With
+    an `interval` of 0, timestamps are written right away.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.timer = None
+        atexit.register(self.flush)
+
+    def record(self, user_id, timestamp):
+        if not self.interval:
+            write_last_logins({user_id: timestamp})
+            return
+
+        with self.lock:
+            self.pending[user_id] = max(timestamp, self.pending.get(user_id, timestamp))
+            if self.timer is None:
+                self.timer = threading.Timer(self.interval, self.flush_in_background)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def take_pending(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        return pending
+
+    def flush(self):
+        pending = self.take_pending()
+        if pending:
+            write_last_logins(pending)
+
+    def flush_in_background(self):
+        pending = self.take_pending()
+        try:
+            if pending:
+                write_last_logins(pending)
+        except Exception:
+            # Retried with the next flush, lost if the process exits before that succeeds
+            logger.exception('Could not write the last logins of %s users', len(pending))
+            for user_id, timestamp in pending.items():
+                self.record(user_id, timestamp)
+        finally:
+            # Connections are per thread and every timer runs on a new one
+            connections.close_all()
+
+
+activity_buffer = ActivityBuffer(settings.ACTIVITY_FLUSH_INTERVAL)
+
+
+def record_login(user):
+    """
+    Record that `user` logged in now, in place of `django.contrib.auth.models.update_last_login()`.
+    """
+    user.last_login = timezone.now()
+    activity_buffer.record(user.pk, user.last_login)
@@ -0,0 +1,37 @@
+from django.contrib import admin
+from django.db.models import Q
+
+from msd.core.admin import ScalableModelAdmin
+
+from .models import UserAccount, VendorUser
+
+
+@admin.register(UserAccount)
+class UserAccountAdmin(ScalableModelAdmin, admin.ModelAdmin):
+    list_display = (
+        'email', 'mobile_number', 'first_name', 'last_name', 'is_active', 'is_staff', 'is_vendor', 'created_at'
+    )
+    # The rare side of each flag has a partial index (see `UserAccount.Meta.indexes`)
+    list_filter = ('is_active', 'is_staff', 'is_vendor')
+    search_fields = ('email', 'mobile_number')
+    search_help_text = 'Start of an email address or mobile number'
+    autocomplete_fields = ('groups',)
+    filter_horizontal = ('user_permissions',)
+    exclude = ('password',)
+    readonly_fields = ('last_login', 'created_at', 'updated_at', 'profile_version')
+
+    def get_search_results(self, request, queryset, search_term):
+        # Prefix matches served by the `varchar_pattern_ops` indexes, instead of `icontains` full table scans
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+
+        return queryset.filter(
+            Q(email__startswith=search_term.lower()) | Q(mobile_number__startswith=search_term)
+        ), False
+
+
+@admin.register(VendorUser)
+class VendorUserAdmin(UserAccountAdmin):
+    list_display = ('email', 'mobile_number', 'vendor_name', 'category', 'is_active', 'created_at')
+    list_filter = ('is_active',)
@@ -1,6 +1,22 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'msd.users'
+
+    def ready(self):
+        from rest_framework_simplejwt.tokens import Token
+
+        from msd.core.checks import check_blocking_migrations
+
+        from . import signals  # noqa: F401
+        from .signing import get_token_backend
+
+        # simplejwt has no setting for the backend, every token class looks it up through this attribute
+        token_backend = get_token_backend()
+        if token_backend is not None:
+            Token._token_backend = token_backend
+
+        checks.register(check_blocking_migrations, checks.Tags.database)
@@ -1,6 +1,10 @@
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
 
 from ..project.settings.auth import AUTH_COOKIE
+from .caching import cache_user, get_cached_user
+from .revocation import revocation_list
+from .roles import PERMISSIONS_CLAIM, from_claim
 
 
 class CustomJWTAuthentication(JWTAuthentication):
@@ -18,7 +22,23 @@ class CustomJWTAuthentication(JWTAuthentication):
                 return None
 
             validated_token = self.get_validated_token(raw_token)
+            if revocation_list.is_revoked(validated_token[api_settings.JTI_CLAIM]):
+                return None
 
             return self.get_user(validated_token), validated_token
         except Exception:
             return None
+
+    def get_user(self, validated_token):
+        user = get_cached_user(validated_token.get(api_settings.USER_ID_CLAIM))
+        if user is None or not user.is_active:
+            # Inactive users are looked up again so that the parent raises the proper error
+            user = super().get_user(validated_token)
+            cache_user(user)
+
+        claim = validated_token.get(PERMISSIONS_CLAIM)
+        if claim is not None:
+            # Used by `has_perm()` instead of a cache lookup if it is still current
+            user._token_permissions = from_claim(claim)
+
+        return user
@@ -0,0 +1,51 @@
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import ValidationError
+
+from .caching import cache_user, cache_user_id_by_mobile_number, get_cached_user, get_cached_user_id_by_mobile_number
+from .models import UserAccount, normalize_mobile_number
+
+
+def get_user_by_mobile_number(mobile_number):
+    """
+    Return the user with the (normalized) mobile number, or None.
+
+    Both the number to user id mapping and the user come from the cache when they can, otherwise the user is
+    fetched with a single probe of the unique mobile number index.
+    """
+    user_id = get_cached_user_id_by_mobile_number(mobile_number)
+    user = get_cached_user(user_id) if user_id is not None else None
+
+    # The number may have moved to another account since it was cached
+    if user is None or user.mobile_number != mobile_number:
+        try:
+            user = UserAccount.objects.get(mobile_number=mobile_number)
+        except UserAccount.DoesNotExist:
+            return None
+
+        cache_user(user)
+        cache_user_id_by_mobile_number(mobile_number, user.pk)
+
+    return user
+
+
+class MobileOTPBackend(ModelBackend):
+    """
+    Authenticate with a mobile number and the one-time code sent to it (see `UserAccount.set_verification_code()`).
+
+    A successful login uses up the code and marks the phone verified.
+    """
+
+    def authenticate(self, request, mobile_number=None, otp=None, **kwargs):
+        if mobile_number is None or otp is None:
+            return None
+
+        try:
+            mobile_number = normalize_mobile_number(mobile_number)
+        except ValidationError:
+            return None
+
+        user = get_user_by_mobile_number(mobile_number)
+        if user is None or not self.user_can_authenticate(user) or not user.verify_phone(otp):
+            return None
+
+        return user
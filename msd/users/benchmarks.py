@@ -0,0 +1,526 @@
+import io
+import ipaddress
+import itertools
+import os
+import random
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from decimal import Decimal
+from urllib.parse import parse_qs, urlsplit
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group, update_last_login
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+from djoser import serializers as djoser_serializers
+from djoser.conf import settings as djoser_settings
+from nacl.signing import SigningKey
+from rest_framework import serializers
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework_simplejwt.tokens import AccessToken
+
+from msd.core.parsers import ORJSONParser
+from msd.core.renderers import ORJSONRenderer
+from msd.core.utils import jws
+from msd.core.utils.benchmark import BenchmarkError, benchmark
+
+from .activity import activity_buffer, record_login
+from .authentication import CustomJWTAuthentication
+from .caching import cache_user, get_cached_user
+from .fake_oauth import FakeOAuthProvider
+from .geolocation import get_database, locate
+from .models import UserAccount
+from .revocation import revocation_list
+from .serializers import UserCreatePasswordRetypeSerializer
+from .signing import Ed25519TokenBackend
+
+BENCHMARK_EMAIL_DOMAIN = 'benchmark.invalid'
+BENCHMARK_PASSWORD = 'Benchmark#2023'
+
+
+def make_benchmark_email(suffix=''):
+    return f'bench-{uuid.uuid4().hex[:12]}{suffix}@{BENCHMARK_EMAIL_DOMAIN}'
+
+
+def delete_benchmark_users():
+    UserAccount.objects.filter(email__endswith=f'@{BENCHMARK_EMAIL_DOMAIN}').delete()
+
+
+def expect_status(response, status_code):
+    if response.status_code != status_code:
+        raise BenchmarkError(f'Expected HTTP {status_code}, got {response.status_code}: {response.content[:200]!r}')
+    return response
+
+
+def create_benchmark_user():
+    return UserAccount.objects.create_user(email=make_benchmark_email(), password=BENCHMARK_PASSWORD)
+
+
+@contextmanager
+def relaxed_throttles():
+    # Keep the throttling overhead in the measurement, but never let the benchmark itself get throttled
+    rates = SimpleRateThrottle.THROTTLE_RATES
+    SimpleRateThrottle.THROTTLE_RATES = {scope: '1000000/s' for scope in rates}
+    try:
+        yield
+    finally:
+        SimpleRateThrottle.THROTTLE_RATES = rates
+
+
+def login(client, user):
+    response = client.post('/api/jwt/create/', {'email': user.email, 'password': BENCHMARK_PASSWORD}, format='json')
+    return expect_status(response, 200)
+
+
+@benchmark('auth.token_obtain')
+def token_obtain_benchmark():
+    user = create_benchmark_user()
+    client = APIClient()
+    with relaxed_throttles():
+        yield lambda: login(client, user)
+    delete_benchmark_users()
+
+
+def last_login_benchmark(record):
+    # Many users logging in, as the writes of one user within an interval are collapsed anyway
+    users = itertools.cycle([create_benchmark_user() for _ in range(100)])
+    yield lambda: record(next(users))
+    activity_buffer.flush()
+    delete_benchmark_users()
+
+
+@benchmark('auth.record_login')
+def record_login_benchmark():
+    yield from last_login_benchmark(record_login)
+
+
+@benchmark('auth.update_last_login')
+def update_last_login_benchmark():
+    yield from last_login_benchmark(lambda user: update_last_login(None, user))
+
+
+@benchmark('auth.token_refresh')
+def token_refresh_benchmark():
+    user = create_benchmark_user()
+    client = APIClient()
+    login(client, user)
+    yield lambda: expect_status(client.post('/api/jwt/refresh/', {}, format='json'), 200)
+    delete_benchmark_users()
+
+
+@benchmark('auth.token_verify')
+def token_verify_benchmark():
+    user = create_benchmark_user()
+    client = APIClient()
+    login(client, user)
+    yield lambda: expect_status(client.post('/api/jwt/verify/', {}, format='json'), 200)
+    delete_benchmark_users()
+
+
+@benchmark('auth.token_introspect')
+def token_introspect_benchmark():
+    # A gateway coalescing the validations of 100 requests, compare per token with `auth.token_verify`
+    users = [create_benchmark_user() for _ in range(10)]
+    tokens = [str(AccessToken.for_user(user)) for user in users for _ in range(10)]
+    client = APIClient()
+    yield lambda: expect_status(client.post('/api/jwt/introspect/', {'tokens': tokens}, format='json'), 200)
+    delete_benchmark_users()
+
+
+@benchmark('auth.token_verify_local')
+def token_verify_local_benchmark():
+    # What a downstream service does per request instead of calling `jwt/verify/`, minus fetching the key set
+    user = create_benchmark_user()
+    token_backend = Ed25519TokenBackend([SigningKey.generate()])
+    token = token_backend.encode(AccessToken.for_user(user).payload)
+    verify_keys = jws.from_jwks(token_backend.get_jwks())
+    yield lambda: jws.decode(token, verify_keys)
+    delete_benchmark_users()
+
+
+@benchmark('auth.logout')
+def logout_benchmark():
+    user = create_benchmark_user()
+    client = APIClient()
+
+    def run():
+        # Logout revokes the token and expires the cookie, every iteration needs a fresh one
+        client.cookies['access'] = str(AccessToken.for_user(user))
+        expect_status(client.post('/api/logout/', {}, format='json'), 204)
+
+    yield run
+    delete_benchmark_users()
+
+
+@benchmark('auth.jwt_authenticate')
+def jwt_authenticate_benchmark():
+    user = create_benchmark_user()
+    access_token = login(APIClient(), user).data['access']
+    request = APIRequestFactory().get('/api/users/me/', HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    authentication = CustomJWTAuthentication()
+
+    def run():
+        if authentication.authenticate(request) is None:
+            raise BenchmarkError('Authentication failed')
+
+    yield run
+    delete_benchmark_users()
+
+
+def has_perm_benchmark(has_perm):
+    # A check on a user freshly loaded from the user cache, as at the start of every request. The role group is
+    # also assigned as a regular group, which is all Django's `ModelBackend` understands.
+    user = create_benchmark_user()
+    user.groups.add(Group.objects.get(name='Normal User'))
+    cache_user(user)
+
+    def run():
+        if not has_perm(get_cached_user(user.pk), 'users.can_custom_action'):
+            raise BenchmarkError('Permission check failed')
+
+    yield run
+    delete_benchmark_users()
+
+
+@benchmark('auth.has_perm')
+def bitmask_has_perm_benchmark():
+    yield from has_perm_benchmark(lambda user, perm: user.has_perm(perm))
+
+
+@benchmark('auth.has_perm_model_backend')
+def model_backend_has_perm_benchmark():
+    yield from has_perm_benchmark(ModelBackend().has_perm)
+
+
+@benchmark('auth.revocation_check')
+def revocation_check_benchmark():
+    jtis = itertools.cycle([uuid.uuid4().hex for _ in range(1000)])
+    revocation_list.rebuild()
+    yield lambda: revocation_list.is_revoked(next(jtis))
+
+
+@benchmark('users.me')
+def me_benchmark():
+    user = create_benchmark_user()
+    client = APIClient()
+    login(client, user)
+    yield lambda: expect_status(client.get('/api/users/me/'), 200)
+    delete_benchmark_users()
+
+
+@benchmark('users.me_not_modified')
+def me_not_modified_benchmark():
+    user = create_benchmark_user()
+    client = APIClient()
+    login(client, user)
+    etag = expect_status(client.get('/api/users/me/'), 200)['ETag']
+    yield lambda: expect_status(client.get('/api/users/me/', HTTP_IF_NONE_MATCH=etag), 304)
+    delete_benchmark_users()
+
+
+@benchmark('users.create_user')
+def create_user_benchmark():
+    counter = itertools.count()
+    prefix = uuid.uuid4().hex[:12]
+
+    def run():
+        UserAccount.objects.create_user(
+            email=f'bench-{prefix}-{next(counter)}@{BENCHMARK_EMAIL_DOMAIN}',
+            password=BENCHMARK_PASSWORD,
+        )
+
+    yield run
+    delete_benchmark_users()
+
+
+@benchmark('users.concurrent_signup')
+def concurrent_signup_benchmark():
+    # Threads racing to sign up the same addresses must all end up with the one user, never a duplicate key error
+    workers = 8
+    executor = ThreadPoolExecutor(workers)
+    rounds = itertools.count()
+    prefix = uuid.uuid4().hex[:12]
+
+    def signup(email):
+        return UserAccount.objects.create_user(email=email).pk
+
+    def run():
+        round_id = next(rounds)
+        emails = [f'race-{prefix}-{round_id}-{index}@{BENCHMARK_EMAIL_DOMAIN}' for index in range(10)]
+        user_ids = set(executor.map(signup, emails * workers))
+        if len(user_ids) != len(emails):
+            raise BenchmarkError(f'{len(user_ids)} users created for {len(emails)} addresses')
+
+    yield run
+
+    # Every worker thread has its own database connection
+    barrier = threading.Barrier(workers)
+
+    def close_connection(_):
+        barrier.wait()
+        connection.close()
+
+    list(executor.map(close_connection, range(workers)))
+    executor.shutdown()
+    delete_benchmark_users()
+
+
+@benchmark('users.bulk_upsert')
+def bulk_upsert_benchmark():
+    counter = itertools.count()
+    prefix = uuid.uuid4().hex[:12]
+
+    def run():
+        # Half of every batch already exists
+        start = next(counter) * 50
+        users = [{'email': f'bulk-{prefix}-{index}@{BENCHMARK_EMAIL_DOMAIN}'} for index in range(start, start + 100)]
+        UserAccount.objects.bulk_upsert_users(users)
+
+    yield run
+    delete_benchmark_users()
+
+
+@benchmark('users.bulk_upsert_mobile')
+def bulk_upsert_mobile_benchmark():
+    counter = itertools.count()
+    # National numbers of a range of its own per run, `+917` and 9 more digits
+    prefix = f'+917{random.randrange(1000):03d}'
+    email_prefix = uuid.uuid4().hex[:12]
+    mobile_numbers = []
+
+    def run():
+        # Every number comes alone, and for every other one also with an email address, in the same call. Half of
+        # the numbers already exist, held by users with an email address or without.
+        start = next(counter) * 50
+        users = []
+        for index in range(start, start + 100):
+            mobile_number = f'{prefix}{index:06d}'
+            mobile_numbers.append(mobile_number)
+            if index % 2:
+                email = f'mobile-{email_prefix}-{index}@{BENCHMARK_EMAIL_DOMAIN}'
+                users.append({'email': email, 'mobile_number': mobile_number})
+            users.append({'mobile_number': mobile_number})
+
+        pairs = UserAccount.objects.bulk_upsert_users(users)
+        holders = {}
+        for kwargs, (user, _created) in zip(users, pairs):
+            if user.mobile_number != kwargs['mobile_number']:
+                raise BenchmarkError(f'Got the user of {user.mobile_number} for {kwargs["mobile_number"]}')
+            if holders.setdefault(user.mobile_number, user.pk) != user.pk:
+                raise BenchmarkError(f'Got two users for {user.mobile_number}')
+
+    yield run
+    UserAccount.objects.filter(mobile_number__in=mobile_numbers).delete()
+    delete_benchmark_users()
+
+
+@benchmark('users.register_single')
+def register_single_benchmark():
+    # The one request per user signup that `users.batch_register` replaces for partners
+    counter = itertools.count()
+    prefix = uuid.uuid4().hex[:12]
+    client = APIClient()
+
+    def run():
+        data = {
+            'email': f'single-{prefix}-{next(counter)}@{BENCHMARK_EMAIL_DOMAIN}',
+            # `BENCHMARK_PASSWORD` is too similar to `BENCHMARK_EMAIL_DOMAIN` for the signup password validators
+            'password': 'Zq7#vLp9!mW2',
+            're_password': 'Zq7#vLp9!mW2',
+        }
+        expect_status(client.post('/api/users/', data, format='json'), 201)
+
+    with relaxed_throttles(), override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+        yield run
+    delete_benchmark_users()
+
+
+def registration_validation_benchmark(serializer_class):
+    # Validation alone, without hashing the password and saving the user, of a signup and of a rejected one
+    data = {'email': make_benchmark_email(), 'password': 'Zq7#vLp9!mW2', 're_password': 'Zq7#vLp9!mW2'}
+    invalid_data = {'email': 'not an email', 'password': '', 're_password': None}
+
+    def run():
+        if not serializer_class(data=data).is_valid() or serializer_class(data=invalid_data).is_valid():
+            raise BenchmarkError('Unexpected validation result')
+
+    yield run
+
+
+@benchmark('users.validate_registration')
+def validate_registration_benchmark():
+    yield from registration_validation_benchmark(UserCreatePasswordRetypeSerializer)
+
+
+@benchmark('users.validate_registration_drf')
+def drf_validate_registration_benchmark():
+    yield from registration_validation_benchmark(djoser_serializers.UserCreatePasswordRetypeSerializer)
+
+
+@benchmark('users.password_policy')
+def password_policy_benchmark():
+    yield lambda: UserAccount.objects.validate_password('Zq7#vLp9!mW2')
+
+
+BATCH_REGISTRATION_BENCHMARK_SIZE = 1000
+
+
+@benchmark('users.batch_register')
+def batch_register_benchmark():
+    # Each run registers `BATCH_REGISTRATION_BENCHMARK_SIZE` users, as many as that many `users.register_single` runs
+    staff_user = create_benchmark_user()
+    staff_user.is_staff = True
+    staff_user.save(update_fields=['is_staff'])
+    client = APIClient()
+    batches = itertools.count()
+    prefix = uuid.uuid4().hex[:12]
+
+    def run():
+        batch = next(batches)
+        emails = [
+            f'batch-{prefix}-{batch}-{index}@{BENCHMARK_EMAIL_DOMAIN}'
+            for index in range(BATCH_REGISTRATION_BENCHMARK_SIZE)
+        ]
+        users = [{'email': email} for email in emails]
+        expect_status(client.post('/api/users/batch/', {'users': users}, format='json'), 200)
+
+    with relaxed_throttles():
+        login(client, staff_user)
+        yield run
+    delete_benchmark_users()
+
+
+def api_request_benchmark(middleware):
+    user = create_benchmark_user()
+    with override_settings(MIDDLEWARE=middleware):
+        # Clients load the middleware chain on their first request
+        client = APIClient()
+        login(client, user)
+        yield lambda: expect_status(client.post('/api/jwt/verify/', {}, format='json'), 200)
+
+    delete_benchmark_users()
+
+
+@benchmark('middleware.api_request')
+def lean_api_request_benchmark():
+    yield from api_request_benchmark(settings.MIDDLEWARE)
+
+
+@benchmark('middleware.api_request_full_stack')
+def full_stack_api_request_benchmark():
+    yield from api_request_benchmark([
+        'django.middleware.security.SecurityMiddleware',
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'corsheaders.middleware.CorsMiddleware',
+        'django.middleware.common.CommonMiddleware',
+        'django.middleware.csrf.CsrfViewMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+        'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    ])
+
+
+class UserListSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = UserAccount
+        exclude = ('password', 'groups', 'user_permissions')
+
+
+def make_user_list_payload(size=100):
+    users = [
+        UserAccount(
+            id=index,
+            first_name='Benchmark',
+            last_name=f'User {index}',
+            email=f'bench-{index}@{BENCHMARK_EMAIL_DOMAIN}',
+            mobile_number=f'98{index:08d}',
+            created_at=timezone.now(),
+            last_login=timezone.now(),
+            latitude=Decimal('17.385044'),
+            longitude=Decimal('78.486671'),
+        ) for index in range(size)
+    ]
+    return UserListSerializer(users, many=True).data
+
+
+@benchmark('json.render_user_list')
+def orjson_render_benchmark():
+    data = make_user_list_payload()
+    renderer = ORJSONRenderer()
+    yield lambda: renderer.render(data)
+
+
+@benchmark('json.render_user_list_stdlib')
+def stdlib_render_benchmark():
+    data = make_user_list_payload()
+    renderer = JSONRenderer()
+    yield lambda: renderer.render(data)
+
+
+@benchmark('json.parse_user_list')
+def orjson_parse_benchmark():
+    content = JSONRenderer().render(make_user_list_payload())
+    parser = ORJSONParser()
+    yield lambda: parser.parse(io.BytesIO(content))
+
+
+@benchmark('json.parse_user_list_stdlib')
+def stdlib_parse_benchmark():
+    content = JSONRenderer().render(make_user_list_payload())
+    parser = JSONParser()
+    yield lambda: parser.parse(io.BytesIO(content))
+
+
+if os.path.exists(settings.GEOIP_DATABASE_PATH):
+
+    @benchmark('geoip.lookup')
+    def geoip_lookup_benchmark():
+        # The memory-mapped database lookup alone, on random public addresses
+        database = get_database()
+        addresses = [ipaddress.IPv4Address(random.randrange(0x01000000, 0xdf000000)) for _ in range(10_000)]
+        addresses = itertools.cycle(addresses)
+        yield lambda: database.lookup(next(addresses))
+
+    @benchmark('geoip.locate_cached')
+    def geoip_locate_cached_benchmark():
+        locate('8.8.8.8')
+        yield lambda: locate('8.8.8.8')
+
+
+def social_login_benchmark(pooled):
+    # Latencies in the ballpark of a TLS handshake and an API call to a remote provider
+    user = {'id': uuid.uuid4().hex, 'email': make_benchmark_email()}
+    provider = FakeOAuthProvider(latency=0.01, handshake_latency=0.05, user=user)
+    redirect_uri = djoser_settings.SOCIAL_AUTH_ALLOWED_REDIRECT_URIS[0]
+    client = APIClient()
+
+    def run():
+        response = expect_status(client.get('/api/o/fake-oauth2/', {'redirect_uri': redirect_uri}), 200)
+        state = parse_qs(urlsplit(response.data['authorization_url']).query)['state'][0]
+        expect_status(client.post(f'/api/o/fake-oauth2/?code=benchmark&state={state}'), 201)
+
+    with provider, override_settings(
+        SOCIAL_AUTH_FAKE_OAUTH2_BASE_URL=provider.base_url, SOCIAL_AUTH_POOLED_REQUESTS=pooled
+    ):
+        yield run
+
+    delete_benchmark_users()
+
+
+if 'msd.users.social.FakeOAuth2' in settings.AUTHENTICATION_BACKENDS:
+
+    @benchmark('social.provider_login')
+    def pooled_social_login_benchmark():
+        yield from social_login_benchmark(pooled=True)
+
+    @benchmark('social.provider_login_unpooled')
+    def unpooled_social_login_benchmark():
+        yield from social_login_benchmark(pooled=False)
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.core.cache import cache
+
+USER_CACHE_KEY = 'users:user:{}'
+PROFILE_CACHE_KEY = 'users:profile:{}:{}'
+MOBILE_CACHE_KEY = 'users:mobile:{}'
+
+
+def get_cached_user(user_id):
+    return cache.get(USER_CACHE_KEY.format(user_id))
+
+
+def cache_user(user):
+    cache.set(USER_CACHE_KEY.format(user.pk), user, settings.USER_CACHE_TIMEOUT)
+
+
+def invalidate_user(user_id):
+    cache.delete(USER_CACHE_KEY.format(user_id))
+
+
+def get_cached_user_id_by_mobile_number(mobile_number):
+    return cache.get(MOBILE_CACHE_KEY.format(mobile_number))
+
+
+def cache_user_id_by_mobile_number(mobile_number, user_id):
+    # Never invalidated, readers check the number against the cached user, which is
+    cache.set(MOBILE_CACHE_KEY.format(mobile_number), user_id, settings.USER_CACHE_TIMEOUT)
+
+
+def get_cached_profile(user):
+    return cache.get(PROFILE_CACHE_KEY.format(user.pk, user.profile_version))
+
+
+def cache_profile(user, data):
+    # Keyed by version, so entries for older versions are never read again and simply expire
+    cache.set(PROFILE_CACHE_KEY.format(user.pk, user.profile_version), data, settings.USER_CACHE_TIMEOUT)
+
+
+PERMISSIONS_CACHE_KEY = 'users:permissions:{}'
+PERMISSIONS_GENERATION_KEY = 'users:permissions:generation'
+
+
+def get_permissions_generation():
+    generation = cache.get(PERMISSIONS_GENERATION_KEY)
+    if generation is None:
+        cache.add(PERMISSIONS_GENERATION_KEY, 0, None)
+        generation = cache.get(PERMISSIONS_GENERATION_KEY, 0)
+    return generation
+
+
+def bump_permissions_generation():
+    # Every compiled permission mask stops matching, they are recompiled on their next use
+    cache.add(PERMISSIONS_GENERATION_KEY, 0, None)
+    cache.incr(PERMISSIONS_GENERATION_KEY)
+
+
+def get_cached_permissions(user_id):
+    return cache.get(PERMISSIONS_CACHE_KEY.format(user_id))
+
+
+def cache_permissions(user_id, permissions):
+    cache.set(PERMISSIONS_CACHE_KEY.format(user_id), permissions, settings.USER_CACHE_TIMEOUT)
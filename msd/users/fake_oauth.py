@@ -0,0 +1,98 @@
+import json
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+DEFAULT_USER = {
+    'id': 'fake-user-1',
+    'email': 'fake-user@fake-oauth.invalid',
+    'first_name': 'Fake',
+    'last_name': 'User',
+}
+
+
+class FakeOAuthHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        # Stands in for the TCP + TLS handshake a real provider costs on every new connection
+        time.sleep(self.server.handshake_latency)
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+    def do_GET(self):  # noqa: N802
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if url.path == '/authorize':
+            code = secrets.token_urlsafe(16)
+            location = f'{query["redirect_uri"]}?{urlencode({"code": code, "state": query.get("state", "")})}'
+            self.respond(302, b'', headers={'Location': location})
+        elif url.path == '/userinfo':
+            self.respond_json(self.server.user)
+        else:
+            self.respond(404, b'')
+
+    def do_POST(self):  # noqa: N802
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+        if urlsplit(self.path).path == '/token':
+            self.respond_json({'access_token': secrets.token_urlsafe(24), 'token_type': 'bearer', 'expires_in': 3600})
+        else:
+            self.respond(404, b'')
+
+    def respond_json(self, data):
+        self.respond(200, json.dumps(data).encode(), headers={'Content-Type': 'application/json'})
+
+    def respond(self, status, body, headers=None):
+        time.sleep(self.server.latency)
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeOAuthProvider:
+    """
+    Minimal OAuth2 provider (authorize, token and userinfo endpoints) for local tests and benchmarks.
+
+    It runs on a background thread and keeps connections alive, with optional artificial latency per request and
+    per new connection to mimic a remote provider. Every authorization code is accepted and always logs in `user`.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, handshake_latency=0.0, user=None):
+        self.server = ThreadingHTTPServer((host, port), FakeOAuthHandler)
+        self.server.daemon_threads = True
+        self.server.latency = latency
+        self.server.handshake_latency = handshake_latency
+        self.server.user = user or DEFAULT_USER
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
@@ -0,0 +1,77 @@
+import ipaddress
+import os
+from decimal import Decimal
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from msd.core.utils.geoip import IPRangeDatabase
+
+UNKNOWN_LOCATION = 'Unknown'
+
+
+class UserLocation(NamedTuple):
+    location: str
+    is_routable: bool
+    latitude: Optional[Decimal] = None
+    longitude: Optional[Decimal] = None
+
+
+@lru_cache(maxsize=None)
+def get_database():
+    """
+    Return the IP range database at `GEOIP_DATABASE_PATH` (see the `build_geoip_database` command), or None.
+
+    Without a database every address resolves to `'Unknown'`, `is_routable` is still computed.
+    """
+    path = settings.GEOIP_DATABASE_PATH
+    if not path or not os.path.exists(path):
+        return None
+
+    return IPRangeDatabase(path)
+
+
+@lru_cache(maxsize=settings.GEOIP_CACHE_SIZE)
+def locate(ip):
+    """
+    Resolve an IP address string in process, without any network call.
+    """
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return UserLocation(UNKNOWN_LOCATION, False)
+
+    if address.version == 6 and address.ipv4_mapped:
+        address = address.ipv4_mapped
+
+    if not address.is_global or address.is_multicast:
+        return UserLocation(UNKNOWN_LOCATION, False)
+
+    database = get_database()
+    geo_location = database.lookup(address) if database else None
+    if geo_location is None:
+        return UserLocation(UNKNOWN_LOCATION, True)
+
+    return UserLocation(geo_location.location, True, geo_location.latitude, geo_location.longitude)
+
+
+def get_client_ip(request):
+    # Same client address that throttling sees, the `X-Forwarded-For` entry added by the outermost of `NUM_PROXIES`
+    # trusted proxies, or the connection's address
+    return BaseThrottle().get_ident(request).strip()
+
+
+def update_user_location(user, request):
+    """
+    Set the user's location fields from the request's client address, saving only if they changed.
+    """
+    location = locate(get_client_ip(request))
+    changed_fields = [field for field, value in location._asdict().items() if getattr(user, field) != value]
+    if not changed_fields:
+        return
+
+    for field in changed_fields:
+        setattr(user, field, getattr(location, field))
+    user.save(update_fields=changed_fields)
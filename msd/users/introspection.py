@@ -0,0 +1,43 @@
+from functools import lru_cache
+
+from django.conf import settings
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import UntypedToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from .revocation import revocation_list
+
+# Claims returned for active tokens, everything a gateway needs to route a request on the user's behalf
+INTROSPECTION_CLAIMS = (
+    api_settings.TOKEN_TYPE_CLAIM, api_settings.USER_ID_CLAIM, api_settings.JTI_CLAIM, 'exp', 'iat'
+)
+
+
+@lru_cache(maxsize=settings.TOKEN_INTROSPECTION_CACHE_SIZE)
+def get_verified_token(token):
+    # Decoding and checking the signature is the expensive part and its outcome never changes for a token, so it is
+    # remembered. Expiry and revocation do change and are checked on every use. Only tokens that verified are: the
+    # TokenError of others is not cached, so junk tokens can't push real ones out.
+    return UntypedToken(token)
+
+
+def introspect_token(token):
+    """
+    Return `{'active': True}` and the `INTROSPECTION_CLAIMS` of a valid, unexpired and unrevoked `token`, otherwise
+    just `{'active': False}`, like an OAuth 2.0 token introspection response (RFC 7662).
+    """
+    try:
+        verified = get_verified_token(token)
+        verified.check_exp(current_time=aware_utcnow())
+    except TokenError:
+        return {'active': False}
+
+    if revocation_list.is_revoked(verified[api_settings.JTI_CLAIM]):
+        return {'active': False}
+
+    return {'active': True, **{claim: verified[claim] for claim in INTROSPECTION_CLAIMS if claim in verified}}
+
+
+def introspect_tokens(tokens):
+    return [introspect_token(token) for token in tokens]
@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from msd.core.utils.benchmark import (
+    BENCHMARKS, BenchmarkError, compare_to_baseline, load_report, make_report, run_benchmarks, save_report
+)
+from msd.users.benchmarks import delete_benchmark_users
+
+BENCHMARKS_DIR = Path(settings.BASE_DIR) / 'benchmarks'
+
+
+class Command(BaseCommand):
+    help = 'Run performance benchmarks and compare them with a saved baseline'  # noqa: A003
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help='Benchmarks to run (default: all), prefixes like "auth." work')
+        parser.add_argument('-n', '--iterations', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--output', type=Path, default=BENCHMARKS_DIR / 'results' / 'latest.json')
+        parser.add_argument('--baseline', type=Path, default=BENCHMARKS_DIR / 'baseline.json')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2, help='Allowed relative slowdown before flagging a regression'
+        )
+        parser.add_argument('--save-baseline', action='store_true', help='Store the results as the new baseline')
+        parser.add_argument('--list', action='store_true', help='List available benchmarks and exit')
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for name in sorted(BENCHMARKS):
+                self.stdout.write(name)
+            return
+
+        names = self.select_benchmarks(options['names'])
+        try:
+            results = run_benchmarks(names, options['iterations'], warmup=options['warmup'])
+        except BenchmarkError as ex:
+            raise CommandError(str(ex))
+        finally:
+            delete_benchmark_users()
+
+        for name, stats in results.items():
+            self.stdout.write(
+                f'{name:<32} {stats["throughput"]:>9.1f}/s  p50 {stats["p50_ms"]:>9.3f}ms  '
+                f'p95 {stats["p95_ms"]:>9.3f}ms  p99 {stats["p99_ms"]:>9.3f}ms'
+            )
+
+        report = make_report(
+            results,
+            django=django.get_version(),
+            database=connection.vendor,
+            debug=settings.DEBUG,
+        )
+        save_report(report, options['output'])
+        self.stdout.write(f'Results saved to {options["output"]}')
+
+        if options['save_baseline']:
+            save_report(report, options['baseline'])
+            self.stdout.write(self.style.SUCCESS(f'Baseline saved to {options["baseline"]}'))
+            return
+
+        if not options['baseline'].exists():
+            self.stdout.write(self.style.WARNING('No baseline found, skipping regression check'))
+            return
+
+        regressions = compare_to_baseline(results, load_report(options['baseline'])['results'], options['tolerance'])
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(regression)
+            raise CommandError(f'{len(regressions)} performance regression(s) against {options["baseline"]}')
+
+        self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
+
+    @staticmethod
+    def select_benchmarks(names):
+        if not names:
+            return sorted(BENCHMARKS)
+
+        selected = [
+            benchmark_name for benchmark_name in sorted(BENCHMARKS)
+            if any(benchmark_name == name or benchmark_name.startswith(name) for name in names)
+        ]
+        if not selected:
+            raise CommandError(f'No benchmarks match {", ".join(names)}')
+
+        return selected
@@ -0,0 +1,32 @@
+import csv
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from msd.core.utils.geoip import write_ip_range_database
+
+
+def read_ranges(path):
+    # DB-IP "IP to City Lite" layout: first_ip, last_ip, continent, country, region, city, latitude, longitude
+    with open(path, newline='', encoding='utf-8') as file:
+        for first_ip, last_ip, _, country, region, city, latitude, longitude in csv.reader(file):
+            location = ', '.join(part for part in (city, region, country) if part)
+            yield first_ip, last_ip, location, latitude or None, longitude or None
+
+
+class Command(BaseCommand):
+    help = 'Build the offline IP geolocation database from a DB-IP "IP to City Lite" CSV file'  # noqa: A003
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path')
+        parser.add_argument('--output', default=settings.GEOIP_DATABASE_PATH)
+
+    def handle(self, *args, **options):
+        try:
+            os.makedirs(os.path.dirname(options['output']) or '.', exist_ok=True)
+            count = write_ip_range_database(options['output'], read_ranges(options['csv_path']))
+        except (OSError, ValueError) as ex:
+            raise CommandError(str(ex))
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote {count} ranges to {options["output"]}'))
@@ -0,0 +1,32 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from msd.users.rollups import fold_rollup_deltas
+
+
+class Command(BaseCommand):
+    help = 'Fold the user rollup deltas appended by signups and deletes into the user rollups'  # noqa: A003
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.ROLLUP_FOLD_BATCH_SIZE)
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.ROLLUP_FOLD_INTERVAL,
+            help='Seconds to wait when all deltas are folded',
+        )
+        parser.add_argument('--once', action='store_true', help='Exit once all deltas are folded')
+
+    def handle(self, *args, **options):
+        folded = 0
+        while True:
+            count = fold_rollup_deltas(options['batch_size'])
+            folded += count
+            if count < options['batch_size']:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Folded {folded} rollup deltas'))
@@ -0,0 +1,15 @@
+import base64
+
+from django.core.management.base import BaseCommand
+from nacl.signing import SigningKey
+
+from msd.core.utils.jws import get_key_id
+
+
+class Command(BaseCommand):
+    help = 'Generate an Ed25519 key for `JWT_SIGNING_KEYS`'  # noqa: A003
+
+    def handle(self, *args, **options):
+        signing_key = SigningKey.generate()
+        self.stdout.write(base64.b64encode(bytes(signing_key)).decode('ascii'))
+        self.stderr.write(f'Key id: {get_key_id(signing_key.verify_key)}')
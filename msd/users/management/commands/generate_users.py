@@ -0,0 +1,76 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from msd.users.models import UserAccount, VendorUser
+from msd.users.synthetic import SYNTHETIC_PASSWORD, SYNTHETIC_USERNAME_PREFIX, generate_population
+
+
+class Command(BaseCommand):
+    help = 'Load a synthetic population of users and vendors for testing at scale (PostgreSQL only)'  # noqa: A003
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100_000, help='Number of users to generate')
+        parser.add_argument(
+            '--seed', type=int, default=0, help='Same seed, count, offset and batch size give the same users'
+        )
+        parser.add_argument(
+            '--offset', type=int, help='Number of the first user, by default after the synthetic users already loaded'
+        )
+        parser.add_argument('--batch-size', type=int, default=10_000, help='Users loaded per transaction')
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=3 * 365,
+            help='Signups of users 0 to offset + count are spread over this many days',
+        )
+        parser.add_argument('--vendor-rate', type=float, default=0.05, help='Fraction of users that are vendors')
+        parser.add_argument('--delete', action='store_true', help='Delete all synthetic users instead')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Synthetic users are loaded with COPY, which needs PostgreSQL')
+
+        if options['delete']:
+            self.delete_population()
+            return
+
+        synthetic_users = UserAccount.objects.filter(username__startswith=SYNTHETIC_USERNAME_PREFIX)
+        offset = options['offset']
+        if offset is None:
+            offset = synthetic_users.count()
+
+        started_at = time.monotonic()
+        population = generate_population(
+            options['count'],
+            seed=options['seed'],
+            offset=offset,
+            batch_size=options['batch_size'],
+            days=options['days'],
+            vendor_rate=options['vendor_rate'],
+        )
+        for loaded in population:
+            rate = loaded / (time.monotonic() - started_at)
+            self.stdout.write(f'{loaded}/{options["count"]} users loaded ({rate:.0f}/s)')
+
+        self.stdout.write(
+            self.style.
+            SUCCESS(f'Loaded {options["count"]} synthetic users from number {offset}, password {SYNTHETIC_PASSWORD}')
+        )
+
+    def delete_population(self):
+        # In SQL, collecting millions of users for cascading deletes would take longer than generating them
+        user_table = UserAccount._meta.db_table
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {VendorUser._meta.db_table} WHERE useraccount_ptr_id IN '
+                f'(SELECT id FROM {user_table} WHERE username LIKE %s)',
+                [f'{SYNTHETIC_USERNAME_PREFIX}%'],
+            )
+            cursor.execute(f'DELETE FROM {user_table} WHERE username LIKE %s', [f'{SYNTHETIC_USERNAME_PREFIX}%'])
+            deleted = cursor.rowcount
+
+        call_command('reconcile_user_rollups', all=True, stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} synthetic users'))
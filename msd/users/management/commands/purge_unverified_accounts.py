@@ -0,0 +1,97 @@
+import json
+from datetime import timedelta
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import OperationalError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from msd.core.utils.batching import iterate_pk_batches, short_transaction, throttle
+from msd.users.models import UserAccount
+
+
+def write_archive(path, lines):
+    with open(path, 'a') as file:
+        file.writelines(lines)
+
+
+class Command(BaseCommand):
+    help = (  # noqa: A003
+        'Delete accounts that never verified their email or phone and whose verification window has passed. '
+        'Activating an account verifies its email, so only never activated email accounts and mobile accounts that '
+        'never entered a code qualify, and none that ever logged in. '
+        'Works in small keyset-ordered batches with short transactions, meant to be run periodically (e.g. cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours', type=float, default=72, help='How long after expiry/signup an account is kept'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--sleep', type=float, default=0.5, help='Seconds to pause between batches')
+        parser.add_argument(
+            '--max-replication-lag', type=float, default=5, help='Pause while replicas lag more than this (seconds)'
+        )
+        parser.add_argument('--limit', type=int, help='Stop after deleting this many accounts')
+        parser.add_argument('--archive', help='Append deleted rows as JSON lines to this file before deleting them')
+        parser.add_argument('--dry-run', action='store_true', help='Only count matching accounts')
+
+    def handle(self, *args, **options):
+        queryset = self.get_queryset(timezone.now() - timedelta(hours=options['grace_hours']))
+
+        if options['dry_run']:
+            self.stdout.write(f'{queryset.count()} unverified accounts would be deleted')
+            return
+
+        deleted = 0
+        for pks in iterate_pk_batches(queryset, options['batch_size']):
+            if options['limit'] is not None:
+                pks = pks[:options['limit'] - deleted]
+
+            try:
+                deleted += self.delete_batch(queryset, pks, options['archive'])
+            except OperationalError as ex:
+                # Most likely the lock timeout, leave these rows for the next run
+                self.stderr.write(f'Skipped batch starting at pk={pks[0]}: {ex}')
+
+            if options['limit'] is not None and deleted >= options['limit']:
+                break
+
+            throttle(options['sleep'], options['max_replication_lag'])
+
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} unverified accounts'))
+
+    @staticmethod
+    def get_queryset(cutoff):
+        return UserAccount.objects.filter(
+            Q(verification_code_expiry__lt=cutoff) |
+            # djoser signups never get a verification code, they stay inactive until activated
+            Q(verification_code_expiry__isnull=True, is_active=False, created_at__lt=cutoff),
+            email_verified=False,
+            phone_verified=False,
+            is_staff=False,
+            is_superuser=False,
+            last_login__isnull=True,
+        )
+
+    @staticmethod
+    def delete_batch(queryset, pks, archive):
+        with short_transaction():
+            # Re-check the criteria (an account may have been verified meanwhile) and skip rows someone else holds
+            locked = queryset.filter(pk__in=pks).select_for_update(skip_locked=True)
+            locked_pks = list(locked.values_list('pk', flat=True))
+            if not locked_pks:
+                return 0
+
+            batch = UserAccount.objects.filter(pk__in=locked_pks)
+            if archive:
+                # Written once the delete commits, so that a batch rolled back (and retried by the next run) is not
+                # archived twice
+                lines = [json.dumps(row, cls=DjangoJSONEncoder) + '\n' for row in batch.values()]
+                transaction.on_commit(partial(write_archive, archive, lines))
+
+            batch.delete()
+
+        return len(locked_pks)
@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+from django.utils import timezone
+
+from msd.users.models import UserAccount, UserRollup, UserRollupDelta
+from msd.users.rollups import reconcile_day
+
+
+class Command(BaseCommand):
+    help = 'Correct the user rollups of recent signup days to match the user table'  # noqa: A003
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help='Number of most recent days to reconcile')
+        parser.add_argument('--all', action='store_true', help='Reconcile every day since the first signup')
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        if options['all']:
+            first_signup = UserAccount.objects.aggregate(first=Min('created_at'))['first']
+            first_rollup_days = [
+                model.objects.aggregate(first=Min('day'))['first'] for model in (UserRollup, UserRollupDelta)
+            ]
+            first_days = [today, *first_rollup_days, first_signup and timezone.localdate(first_signup)]
+            first_day = min(day for day in first_days if day is not None)
+        else:
+            first_day = today - timedelta(days=options['days'] - 1)
+
+        corrected = 0
+        day = first_day
+        # One short transaction per day, oldest first, signups are not blocked meanwhile
+        while day <= today:
+            corrected += reconcile_day(day)
+            day += timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(f'Corrected {corrected} rollup rows since {first_day}'))
@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from msd.users.outbox import get_sink, relay_batch
+
+
+class Command(BaseCommand):
+    help = 'Relay user lifecycle events from the outbox to `OUTBOX_SINK`'  # noqa: A003
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE)
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.OUTBOX_POLL_INTERVAL,
+            help='Seconds to wait when the outbox is drained',
+        )
+        parser.add_argument('--once', action='store_true', help='Exit once the outbox is drained')
+
+    def handle(self, *args, **options):
+        sink = get_sink()
+        relayed = 0
+        while True:
+            count = relay_batch(sink, options['batch_size'])
+            relayed += count
+            if count < options['batch_size']:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Relayed {relayed} events'))
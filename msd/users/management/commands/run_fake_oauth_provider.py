@@ -0,0 +1,27 @@
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from msd.users.fake_oauth import FakeOAuthProvider
+
+
+class Command(BaseCommand):
+    help = 'Run the fake OAuth2 provider used by the `fake-oauth2` social backend'  # noqa: A003
+
+    def add_arguments(self, parser):
+        parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+        parser.add_argument(
+            '--handshake-latency', type=float, default=0.0, help='Seconds added to every new connection'
+        )
+
+    def handle(self, *args, **options):
+        url = urlsplit(settings.SOCIAL_AUTH_FAKE_OAUTH2_BASE_URL)
+        provider = FakeOAuthProvider(
+            host=url.hostname,
+            port=url.port,
+            latency=options['latency'],
+            handshake_latency=options['handshake_latency'],
+        )
+        self.stdout.write(f'Fake OAuth2 provider listening on {provider.base_url}')
+        provider.server.serve_forever()
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.6 on 2026-10-19 15:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_revokedtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='useraccount',
+            name='profile_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='useraccount',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
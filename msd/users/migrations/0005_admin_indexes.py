@@ -0,0 +1,38 @@
+# Generated by Django 4.2.6 on 2026-10-19 16:02
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Built without locking writes to the user table
+    atomic = False
+
+    dependencies = [
+        ('users', '0004_profile_version'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='useraccount',
+            index=models.Index(condition=models.Q(('is_staff', True)), fields=['id'], name='users_staff_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='useraccount',
+            index=models.Index(condition=models.Q(('is_vendor', True)), fields=['id'], name='users_vendor_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='useraccount',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['id'], name='users_inactive_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='useraccount',
+            index=models.Index(fields=['email'], name='users_email_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='useraccount',
+            index=models.Index(
+                fields=['mobile_number'], name='users_mobile_prefix_idx', opclasses=['varchar_pattern_ops']
+            ),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.6 on 2026-10-19 16:08
+
+from django.db import migrations
+
+PERMISSIONS = [
+    ('can_custom_action', 'Can perform a custom action'),
+    ('can_staff_action', 'Can perform a staff action'),
+    ('can_vendor_action', 'Can perform a vendor action'),
+]
+
+ROLE_GROUP_PERMISSIONS = {
+    'Normal User': ['can_custom_action'],
+    'Vendor User': ['can_custom_action', 'can_vendor_action'],
+    'Staff User': ['can_custom_action', 'can_staff_action'],
+}
+
+
+def create_role_groups(apps, schema_editor):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Permission = apps.get_model('auth', 'Permission')
+    Group = apps.get_model('auth', 'Group')
+
+    # Permissions are normally created after migrating, the groups need them now
+    content_type, _ = ContentType.objects.get_or_create(app_label='users', model='useraccount')
+    permissions = {}
+    for codename, name in PERMISSIONS:
+        permissions[codename], _ = Permission.objects.get_or_create(
+            codename=codename, content_type=content_type, defaults={'name': name}
+        )
+
+    for group_name, codenames in ROLE_GROUP_PERMISSIONS.items():
+        group, _ = Group.objects.get_or_create(name=group_name)
+        group.permissions.add(*(permissions[codename] for codename in codenames))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('users', '0006_outboxevent'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='useraccount',
+            options={
+                'permissions': [
+                    ('can_custom_action', 'Can perform a custom action'),
+                    ('can_staff_action', 'Can perform a staff action'),
+                    ('can_vendor_action', 'Can perform a vendor action'),
+                ]
+            },
+        ),
+        migrations.RunPython(create_role_groups, migrations.RunPython.noop),
+    ]
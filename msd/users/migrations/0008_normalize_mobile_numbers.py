@@ -0,0 +1,87 @@
+# Generated by Django 4.2.6 on 2026-10-19 17:02
+
+import logging
+
+from django.db import migrations, models
+
+import msd.users.models
+from msd.core.utils.batching import iterate_pk_batches, short_transaction
+from msd.core.utils.phone import normalize_e164
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+# Existing national numbers are Indian. Fixed here rather than read from `MOBILE_DEFAULT_COUNTRY_CODE`, which may
+# change later, and the rewrite can't be undone.
+DEFAULT_COUNTRY_CODE = '91'
+NATIONAL_NUMBER_LENGTH = 10
+
+
+def normalize_mobile_numbers(apps, schema_editor):
+    UserAccount = apps.get_model('users', 'UserAccount')
+    users = UserAccount.objects.using(schema_editor.connection.alias)
+
+    # Users whose number is left as it is, for support to correct. Saving them works, as long as the number is not
+    # changed to another invalid one.
+    invalid = []
+    taken_by_others = []
+
+    # One short transaction per batch, so the table is never locked for long
+    for pks in iterate_pk_batches(users.filter(mobile_number__gt=''), BATCH_SIZE):
+        with short_transaction(using=schema_editor.connection.alias):
+            changed = []
+            for user in users.select_for_update().filter(pk__in=pks).only('mobile_number'):
+                try:
+                    mobile_number = normalize_e164(user.mobile_number, DEFAULT_COUNTRY_CODE, NATIONAL_NUMBER_LENGTH)
+                except ValueError:
+                    invalid.append(user.pk)
+                    continue
+
+                if mobile_number != user.mobile_number:
+                    changed.append((user, mobile_number))
+
+            wanted = [mobile_number for _, mobile_number in changed]
+            taken = set(users.filter(mobile_number__in=wanted).values_list('mobile_number', flat=True))
+            updated = []
+            for user, mobile_number in changed:
+                if mobile_number in taken:
+                    taken_by_others.append(user.pk)
+                    continue
+
+                taken.add(mobile_number)
+                user.mobile_number = mobile_number
+                updated.append(user)
+
+            users.bulk_update(updated, ['mobile_number'])
+
+    if invalid:
+        logger.warning('Left the invalid mobile numbers of %s users as they are: %s', len(invalid), invalid)
+    if taken_by_others:
+        logger.warning(
+            'Left the mobile numbers of %s users, taken by other users once normalized, as they are: %s',
+            len(taken_by_others), taken_by_others
+        )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('users', '0007_roles'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='useraccount',
+            name='mobile_number',
+            field=models.CharField(
+                blank=True,
+                max_length=16,
+                null=True,
+                unique=True,
+                validators=[msd.users.models.validate_mobile_number]
+            ),
+        ),
+        migrations.RunPython(normalize_mobile_numbers, migrations.RunPython.noop),
+    ]
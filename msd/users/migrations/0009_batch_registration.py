@@ -0,0 +1,24 @@
+# Generated by Django 4.2.6 on 2026-10-19 17:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_normalize_mobile_numbers'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='useraccount',
+            options={
+                'permissions': [
+                    ('can_custom_action', 'Can perform a custom action'),
+                    ('can_staff_action', 'Can perform a staff action'),
+                    ('can_vendor_action', 'Can perform a vendor action'),
+                    ('can_batch_register', 'Can register users in batches'),
+                ]
+            },
+        ),
+    ]
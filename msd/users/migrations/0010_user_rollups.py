@@ -0,0 +1,64 @@
+# Generated by Django 4.2.6 on 2026-10-19 18:25
+
+from collections import Counter
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+DIMENSIONS = ('day', 'is_vendor', 'gender', 'location', 'email_verified')
+
+
+def backfill_user_rollups(apps, schema_editor):
+    UserAccount = apps.get_model('users', 'UserAccount')
+    UserRollup = apps.get_model('users', 'UserRollup')
+    alias = schema_editor.connection.alias
+
+    # The one full scan, from here on the rollups are maintained incrementally
+    users = UserAccount.objects.using(alias).annotate(day=TruncDate('created_at'))
+    rows = users.values(*DIMENSIONS).annotate(count=Count('pk')).order_by()
+
+    counts = Counter()
+    for row in rows.iterator():
+        # Unknown genders are stored as empty strings, both NULL and empty count as one
+        key = tuple(row[dimension] or '' if dimension == 'gender' else row[dimension] for dimension in DIMENSIONS)
+        counts[key] += row['count']
+
+    rollups = [UserRollup(**dict(zip(DIMENSIONS, key)), count=count) for key, count in counts.items()]
+    UserRollup.objects.using(alias).bulk_create(rollups, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    # The index is built without locking writes to the user table
+    atomic = False
+
+    dependencies = [
+        ('users', '0009_batch_registration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('is_vendor', models.BooleanField()),
+                ('gender', models.CharField(blank=True, max_length=10)),
+                ('location', models.CharField(max_length=255)),
+                ('email_verified', models.BooleanField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='userrollup',
+            constraint=models.UniqueConstraint(
+                fields=('day', 'is_vendor', 'gender', 'location', 'email_verified'), name='users_rollup_key'
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='useraccount',
+            index=models.Index(fields=['created_at'], name='users_created_at_idx'),
+        ),
+        migrations.RunPython(backfill_user_rollups, migrations.RunPython.noop, atomic=True),
+    ]
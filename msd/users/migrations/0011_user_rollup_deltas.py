@@ -0,0 +1,25 @@
+# Generated by Django 4.2.6 on 2026-10-19 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0010_user_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserRollupDelta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('is_vendor', models.BooleanField()),
+                ('gender', models.CharField(blank=True, max_length=10)),
+                ('location', models.CharField(max_length=255)),
+                ('email_verified', models.BooleanField()),
+                ('count', models.IntegerField()),
+            ],
+        ),
+    ]
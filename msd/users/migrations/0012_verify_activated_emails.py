@@ -0,0 +1,64 @@
+# Generated by Django 4.2.6 on 2026-10-19 21:40
+
+import logging
+from collections import Counter
+
+from django.db import migrations, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+from msd.core.utils.batching import iterate_pk_batches
+
+logger = logging.getLogger(__name__)
+
+# `UserRollup` key fields other than `email_verified`, which the backfill changes
+DIMENSIONS = ('day', 'is_vendor', 'gender', 'location')
+
+
+def verify_activated_emails(apps, schema_editor):
+    """
+    Mark the emails of active accounts verified: activation only ever set `is_active`, and accounts with an email
+    address are inactive until activated.
+    """
+    UserAccount = apps.get_model('users', 'UserAccount')
+    UserRollupDelta = apps.get_model('users', 'UserRollupDelta')
+    alias = schema_editor.connection.alias
+
+    unverified = UserAccount.objects.using(alias).filter(is_active=True, email__isnull=False, email_verified=False)
+    updated = 0
+    for pks in iterate_pk_batches(unverified, 1000):
+        with transaction.atomic(using=alias):
+            # Locked first, PostgreSQL doesn't lock rows that are grouped
+            locked = list(unverified.filter(pk__in=pks).select_for_update().values_list('pk', flat=True))
+            batch = UserAccount.objects.using(alias).filter(pk__in=locked)
+            rows = batch.annotate(day=TruncDate('created_at')).values(*DIMENSIONS).annotate(count=Count('pk'))
+
+            # The users move from the unverified to the verified `UserRollup` counts of their day
+            counts = Counter()
+            for row in rows.order_by():
+                key = tuple(
+                    row[dimension] or '' if dimension == 'gender' else row[dimension] for dimension in DIMENSIONS
+                )
+                counts[key] += row['count']
+            UserRollupDelta.objects.using(alias).bulk_create([
+                UserRollupDelta(**dict(zip(DIMENSIONS, key)), email_verified=email_verified, count=sign * count)
+                for key, count in counts.items()
+                for email_verified, sign in ((False, -1), (True, 1))
+            ])
+            updated += batch.update(email_verified=True)
+
+    if updated:
+        logger.info('Marked the emails of %s activated accounts verified', updated)
+
+
+class Migration(migrations.Migration):
+    # One short transaction per batch of users
+    atomic = False
+
+    dependencies = [
+        ('users', '0011_user_rollup_deltas'),
+    ]
+
+    operations = [
+        migrations.RunPython(verify_activated_emails, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,30 @@
-import re
+import secrets
+from collections import Counter
+from datetime import timedelta
 
+from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.core import exceptions
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.models import Q
 from django.utils import timezone
 from django.utils.translation import gettext as _
 
+from msd.core.utils.db import insert_or_get
+from msd.core.utils.phone import normalize_e164
+
+from .roles import get_permissions, permission_index
+
+# Users are unique by email address, or by mobile number if they have no email address
+UPSERT_CONFLICT_FIELDS = ('email', 'mobile_number')
+
+# A password needs at least one of these (see `UserAccountManager.validate_password()`)
+PASSWORD_SPECIAL_CHARACTERS = frozenset('!@#$%^&*(),.?":{}|<>')
+
+
+def get_upsert_key(user):
+    return ('email', user.email) if user.email is not None else ('mobile_number', user.mobile_number)
+
 
 class UserAccountManager(BaseUserManager):
     """
@@ -18,6 +37,8 @@ class UserAccountManager(BaseUserManager):
 
     Methods:
         create_user(email, date_of_birth, password=None, **kwargs): Create a new user account.
+        upsert_user(**kwargs): Create a user account or return the existing one, in a single statement.
+        bulk_upsert_users(users): Create or return many user accounts at once.
         create_superuser(email, password=None, **kwargs): Create a new superuser account.
     """
 
@@ -25,6 +46,8 @@ class UserAccountManager(BaseUserManager):
         """
         Create and save a new user account with email and password or mobile number.
 
+        If a user with the email address (or, without one, the mobile number) already exists, it is returned instead.
+
         Args:
             email (str, optional): The user's email address. Defaults to None.
             password (str, optional): The user's password. Defaults to None.
@@ -38,6 +61,89 @@ class UserAccountManager(BaseUserManager):
             exceptions.ValidationError: If both email and mobile number are missing.
             exceptions.ValidationError: If the password does not meet the validation criteria.
         """
+        user, _ = self.upsert_user(
+            email=email,
+            password=password,
+            mobile_number=mobile_number,
+            is_vendor=is_vendor,
+            is_staff=is_staff,
+            **kwargs,
+        )
+        return user
+
+    def upsert_user(self, **kwargs):
+        """
+        Create a user unless one with the same email address (or, without one, mobile number) exists.
+
+        Takes the arguments of `create_user()`. On PostgreSQL this is a single `INSERT ... ON CONFLICT` statement, so
+        concurrent signups for the same email address return the same user instead of failing on the unique
+        constraint.
+
+        Returns:
+            tuple: The new or existing `UserAccount` and whether it was created.
+        """
+        return self.bulk_upsert_users([kwargs])[0]
+
+    def bulk_upsert_users(self, users):
+        """
+        Create many users at once, returning the existing ones where the email address or mobile number is taken.
+
+        Args:
+            users (list): `create_user()` keyword arguments for each user.
+
+        Returns:
+            list: A `(UserAccount, created)` pair for each of `users`, in the same order. Duplicates within `users`
+                get the same pair.
+
+        Raises:
+            exceptions.ValidationError: As `create_user()`, for any of the users.
+        """
+        using = self._db or router.db_for_write(self.model)
+        new_users = [self.make_user(**user) for user in users]
+
+        batches = {conflict_field: {} for conflict_field in UPSERT_CONFLICT_FIELDS}
+        for user in new_users:
+            key = get_upsert_key(user)
+            batches[key[0]].setdefault(key, user)
+
+        results = {}
+        with transaction.atomic(using=using):
+            for conflict_field, batch in batches.items():
+                results.update(self.insert_users(batch, conflict_field, using))
+
+        return [results[get_upsert_key(user)] for user in new_users]
+
+    def insert_users(self, batch, conflict_field, using):
+        # Multi-table children (`VendorUser`) and other databases take the slower SELECT then INSERT path
+        if self.model._meta.parents or connections[using].vendor != 'postgresql':
+            results = {}
+            for key, user in batch.items():
+                existing_user = self.using(using).filter(**{conflict_field: key[1]}).first()
+                if existing_user is None:
+                    user.save(using=using)
+                results[key] = (existing_user or user, existing_user is None)
+            return results
+
+        for user in batch.values():
+            user.profile_version = 1  # As after the first `save()`
+
+        # Keyed by the conflicting value rather than `get_upsert_key()`: the existing user a mobile number belongs to
+        # may have an email address as well
+        results = {}
+        for user, created in insert_or_get(self.model, batch.values(), conflict_field, using):
+            results[conflict_field, getattr(user, conflict_field)] = (user, created)
+        # What `save()` would have recorded
+        created_users = [user for user, created in results.values() if created]
+        OutboxEvent.objects.using(using).bulk_create([
+            event for user in created_users for event in user.make_events(adding=True, update_fields=None)
+        ])
+        UserRollup.objects.add(Counter(get_rollup_key(user.get_rollup_values()) for user in created_users), using)
+        return results
+
+    def make_user(self, email=None, password=None, mobile_number=None, **kwargs):
+        """
+        Validate the `create_user()` arguments and return an unsaved user account.
+        """
         if email is None and mobile_number is None:
             raise exceptions.ValidationError(
                 _('Please provide an email address or mobile number.')
@@ -46,22 +152,14 @@ class UserAccountManager(BaseUserManager):
         if password is not None:
             self.validate_password(password)
 
-        existing_user = self.get_by_email(email)
-
-        if existing_user:
-            return existing_user
-
         user = self.model(
             email=self.normalize_email(email).lower() if email else None,
-            mobile_number=mobile_number,
-            is_vendor=is_vendor,
-            is_staff=is_staff,
+            mobile_number=normalize_mobile_number(mobile_number) if mobile_number else None,
             **kwargs,
         )
 
         if password is not None:
             user.set_password(password)
-        user.save(using=self._db)
         return user
 
     def get_by_email(self, email):
@@ -88,14 +186,19 @@ class UserAccountManager(BaseUserManager):
         if password is not None:
             self.validate_password(password)
 
-        user = self.create_user(
-            email=email,
-            password=password,
-            **kwargs,
-        )
-        user.is_staff = True
-        user.is_superuser = True
-        user.save(using=self._db)
+        # New users are inserted as superusers right away, only existing ones need an update
+        with transaction.atomic(using=self._db):
+            user, created = self.upsert_user(
+                email=email,
+                password=password,
+                is_staff=True,
+                is_superuser=True,
+                **kwargs,
+            )
+            if not created and not (user.is_staff and user.is_superuser):
+                user.is_staff = True
+                user.is_superuser = True
+                user.save(using=self._db, update_fields=['is_staff', 'is_superuser'])
         return user
 
     def validate_password(self, password):
@@ -113,22 +216,34 @@ class UserAccountManager(BaseUserManager):
                 _('The password must be at least 8 characters long.')
             )
 
-        if not any(char.isupper() for char in password):
+        # The character classes are exclusive, so a single pass over the password tells which ones it has
+        has_upper = has_lower = has_digit = has_special = False
+        for char in password:
+            if char.isupper():
+                has_upper = True
+            elif char.islower():
+                has_lower = True
+            elif char.isdigit():
+                has_digit = True
+            elif char in PASSWORD_SPECIAL_CHARACTERS:
+                has_special = True
+
+        if not has_upper:
             raise exceptions.ValidationError(
                 _('The password must contain at least one uppercase character.')
             )
 
-        if not any(char.islower() for char in password):
+        if not has_lower:
             raise exceptions.ValidationError(
                 _('The password must contain at least one lowercase character.')
             )
 
-        if not any(char.isdigit() for char in password):
+        if not has_digit:
             raise exceptions.ValidationError(
                 _('The password must contain at least one digit.')
             )
 
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+        if not has_special:
             raise exceptions.ValidationError(
                 _(
                     'The password must contain at least one special character (e.g., !@#$%^&*()).'
@@ -136,6 +251,29 @@ class UserAccountManager(BaseUserManager):
             )
 
 
+def normalize_mobile_number(mobile_number):
+    """
+    Return the mobile number in E.164 format, the form it is stored and looked up in.
+
+    National numbers are taken to be in `MOBILE_DEFAULT_COUNTRY_CODE`.
+
+    Args:
+        mobile_number (str): The mobile number, with or without formatting characters and country code.
+
+    Returns:
+        str: The normalized mobile number, e.g. `+919876543210`.
+
+    Raises:
+        exceptions.ValidationError: If the mobile number is invalid.
+    """
+    try:
+        return normalize_e164(
+            mobile_number, settings.MOBILE_DEFAULT_COUNTRY_CODE, settings.MOBILE_NATIONAL_NUMBER_LENGTH
+        )
+    except ValueError:
+        raise exceptions.ValidationError(_('Enter a valid mobile number.'))
+
+
 def validate_mobile_number(mobile_number):
     """
     Validate the mobile number.
@@ -149,14 +287,21 @@ def validate_mobile_number(mobile_number):
     Raises:
         exceptions.ValidationError: If the mobile number is invalid.
     """
-    # Ensure the mobile number contains only digits
-    if not mobile_number.isdigit():
-        raise exceptions.ValidationError(_('Mobile number must contain only digits.'))
+    return normalize_mobile_number(mobile_number)
 
-    # Remove non-digit characters and whitespace from the mobile number
-    cleaned_mobile_number = re.sub(r'\D', '', mobile_number)
 
-    return cleaned_mobile_number
+# Saves that only touch these are bookkeeping, not profile updates other services need to hear about
+NON_PROFILE_FIELDS = {'last_login', 'password', 'verification_code', 'verification_code_expiry'}
+VERIFICATION_FIELDS = ('email_verified', 'phone_verified')
+
+# The dimensions users are counted by in `UserRollup`, `created_at` standing for its day
+ROLLUP_FIELDS = ('created_at', 'is_vendor', 'gender', 'location', 'email_verified')
+
+
+def get_rollup_key(values):
+    # `UserRollup` key of a user's `ROLLUP_FIELDS` values
+    created_at, is_vendor, gender, location, email_verified = values
+    return timezone.localdate(created_at), is_vendor, gender or '', location, email_verified
 
 
 class UserAccount(AbstractBaseUser, PermissionsMixin):
@@ -177,7 +322,7 @@ class UserAccount(AbstractBaseUser, PermissionsMixin):
         address (str, optional): The user's address. Defaults to None.
         gender (str, optional): The user's gender. Defaults to None.
         profile_picture (ImageField, optional): The user's profile picture. Defaults to None.
-        mobile_number (str, optional): The user's mobile number. Defaults to None.
+        mobile_number (str, optional): The user's mobile number, in E.164 format. Defaults to None.
         email_verified (bool): Whether the user's email is verified.
         phone_verified (bool): Whether the user's phone number is verified.
         created_at (datetime): The user's creation date and time.
@@ -187,6 +332,8 @@ class UserAccount(AbstractBaseUser, PermissionsMixin):
         verification_code_expiry (datetime, optional): The expiration time for the verification code. Defaults to None.
         latitude (Decimal, optional): The user's latitude. Defaults to None.
         longitude (Decimal, optional): The user's longitude. Defaults to None.
+        profile_version (int): Bumped on every save, identifies a version of the profile for caching.
+        updated_at (datetime): When the user was last saved.
 
     Manager:
         objects (UserAccountManager): The custom manager for this user model.
@@ -196,9 +343,15 @@ class UserAccount(AbstractBaseUser, PermissionsMixin):
         REQUIRED_FIELDS (list): List of fields required for user creation.
 
     Methods:
+        save(): Save the user, bumping its profile version and recording outbox events.
+        make_events(adding, update_fields): Return the outbox events of a save.
+        get_rollup_changes(adding, update_fields): Return how a save changes the `UserRollup` counts.
+        set_verification_code(): Issue a new one-time verification code.
+        verify_phone(code): Use up a verification code sent to the user's phone.
         __str__(): Return the string representation of the user.
         get_full_name(): Return the full name of the user.
         get_short_name(): Return the short name of the user.
+        get_compiled_permissions(): Return the user's effective permissions as a bitmask.
         has_perm(perm, obj=None): Does the user have a specific permission?
         has_module_perms(app_label): Does the user have permissions to view the app `app_label`?
     """
@@ -217,7 +370,7 @@ class UserAccount(AbstractBaseUser, PermissionsMixin):
     gender = models.CharField(max_length=10, blank=True, null=True, choices=GENDER_CHOICES)
     profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
     mobile_number = models.CharField(
-        max_length=15,
+        max_length=16,  # E.164, see `normalize_mobile_number()`
         unique=True,
         blank=True,
         null=True,
@@ -232,11 +385,160 @@ class UserAccount(AbstractBaseUser, PermissionsMixin):
     verification_code_expiry = models.DateTimeField(blank=True, null=True)
     latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    profile_version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     objects = UserAccountManager()
 
     USERNAME_FIELD = 'email'
 
+    class Meta:
+        indexes = [
+            # Signup day ranges of `reconcile_user_rollups`
+            models.Index(fields=['created_at'], name='users_created_at_idx'),
+            # Admin list filters, the rare side of each flag in the change list's `-pk` order
+            models.Index(fields=['id'], condition=Q(is_staff=True), name='users_staff_idx'),
+            models.Index(fields=['id'], condition=Q(is_vendor=True), name='users_vendor_idx'),
+            models.Index(fields=['id'], condition=Q(is_active=False), name='users_inactive_idx'),
+            # Admin prefix search
+            models.Index(fields=['email'], opclasses=['varchar_pattern_ops'], name='users_email_prefix_idx'),
+            models.Index(fields=['mobile_number'], opclasses=['varchar_pattern_ops'], name='users_mobile_prefix_idx'),
+        ]
+        # Granted through the role groups, see `USER_ROLE_GROUPS`
+        permissions = [
+            ('can_custom_action', 'Can perform a custom action'),
+            ('can_staff_action', 'Can perform a staff action'),
+            ('can_vendor_action', 'Can perform a vendor action'),
+            ('can_batch_register', 'Can register users in batches'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered to tell when a save verifies the email or phone, see `make_events()`
+        loaded_values = dict(zip(field_names, values))
+        instance._loaded_verification = {
+            field: value for field, value in loaded_values.items() if field in VERIFICATION_FIELDS
+        }
+        # Whether the mobile number changed, see `save()`
+        instance._loaded_mobile_number = loaded_values.get('mobile_number')
+        # And which `UserRollup` row the user is counted in, see `get_rollup_changes()`
+        if loaded_values.keys() >= set(ROLLUP_FIELDS):
+            instance._loaded_rollup_values = tuple(loaded_values[field] for field in ROLLUP_FIELDS)
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Save the user, bumping its profile version so cached copies and ETags of the old version stop matching.
+
+        A new or changed mobile number is normalized to E.164. Lifecycle events for other services are written to the
+        outbox and the user's `UserRollup` counts are updated in the same transaction.
+        """
+        adding = self._state.adding
+        self.profile_version += 1
+        # Unchanged numbers are left alone, legacy ones that don't normalize must not fail every later save (e.g. the
+        # location update at login)
+        mobile_number = self.__dict__.get('mobile_number')
+        if mobile_number and mobile_number != getattr(self, '_loaded_mobile_number', None):
+            self.mobile_number = normalize_mobile_number(mobile_number)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'profile_version', 'updated_at'}
+
+        rollup_values, rollup_counts = self.get_rollup_changes(adding, update_fields)
+
+        using = kwargs.get('using') or router.db_for_write(self.__class__, instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+            OutboxEvent.objects.using(using).bulk_create(self.make_events(adding, update_fields))
+            UserRollup.objects.add(rollup_counts, using)
+
+        self._loaded_rollup_values = rollup_values
+        self._loaded_mobile_number = self.__dict__.get('mobile_number')
+
+    def make_events(self, adding, update_fields):
+        """
+        Return the unsaved `OutboxEvent`s describing a save of this user (see `msd.users.outbox`).
+        """
+        events = []
+        version = self.profile_version
+        if adding:
+            payload = {'email': self.email, 'mobile_number': self.mobile_number, 'is_vendor': self.is_vendor}
+            events.append((OutboxEvent.USER_CREATED, {**payload, 'version': version}))
+        elif update_fields is None or not set(update_fields) <= NON_PROFILE_FIELDS:
+            fields = update_fields and sorted(update_fields)
+            events.append((OutboxEvent.USER_UPDATED, {'fields': fields, 'version': version}))
+
+        loaded_verification = getattr(self, '_loaded_verification', {})
+        verified = [
+            field for field, loaded_value in loaded_verification.items()
+            if not loaded_value and getattr(self, field) and (update_fields is None or field in update_fields)
+        ]
+        if verified:
+            events.append((OutboxEvent.USER_VERIFIED, {'fields': verified, 'version': version}))
+            self._loaded_verification.update(dict.fromkeys(verified, True))
+
+        return [OutboxEvent(event_type=event_type, user_id=self.pk, payload=payload) for event_type, payload in events]
+
+    def get_rollup_values(self):
+        return tuple(getattr(self, field) for field in ROLLUP_FIELDS)
+
+    def get_rollup_changes(self, adding, update_fields):
+        """
+        Return the user's `ROLLUP_FIELDS` values after a save, and how the save changes the `UserRollup` counts.
+        """
+        values = self.get_rollup_values()
+        loaded_values = getattr(self, '_loaded_rollup_values', None)
+        if adding:
+            return values, Counter({get_rollup_key(values): 1})
+        if loaded_values is None:
+            # Not loaded from the database, left to `reconcile_user_rollups`
+            return values, Counter()
+
+        if update_fields is not None:
+            # Fields left out of the save keep their stored values
+            values = tuple(
+                value if field in update_fields else loaded_value
+                for field, value, loaded_value in zip(ROLLUP_FIELDS, values, loaded_values)
+            )
+
+        counts = Counter({get_rollup_key(values): 1})
+        counts[get_rollup_key(loaded_values)] -= 1
+        return values, counts
+
+    def set_verification_code(self):
+        """
+        Generate, store and return a new one-time code, valid for `VERIFICATION_CODE_LIFETIME` seconds.
+        """
+        self.verification_code = f'{secrets.randbelow(10 ** 6):06d}'
+        self.verification_code_expiry = timezone.now() + timedelta(seconds=settings.VERIFICATION_CODE_LIFETIME)
+        self.save(update_fields=['verification_code', 'verification_code_expiry'])
+        return self.verification_code
+
+    def verify_phone(self, code):
+        """
+        Use up the one-time code sent to the user's phone, marking the phone verified.
+
+        Returns:
+            bool: Whether the code was valid.
+        """
+        using = router.db_for_write(UserAccount, instance=self)
+        with transaction.atomic(using=using):
+            # Checked and cleared in one statement, so concurrent requests can't both use the same code
+            used = UserAccount.objects.using(using).filter(
+                pk=self.pk, verification_code=code, verification_code_expiry__gt=timezone.now()
+            ).update(verification_code=None, verification_code_expiry=None)
+            if not used:
+                return False
+
+            self.verification_code = self.verification_code_expiry = None
+            if not self.phone_verified:
+                self.phone_verified = True
+                self.save(using=using, update_fields=['phone_verified'])
+
+        return True
+
     def __str__(self):
         """
         Return the email address as the string representation of the user.
@@ -264,15 +566,35 @@ class UserAccount(AbstractBaseUser, PermissionsMixin):
         """
         return self.first_name
 
+    def get_compiled_permissions(self):
+        """
+        Return the user's `CompiledPermissions` (see `msd.users.roles`), looked up once per instance.
+        """
+        compiled = self.__dict__.get('_compiled_permissions')
+        if compiled is None:
+            compiled = self._compiled_permissions = get_permissions(self)
+        return compiled
+
     def has_perm(self, perm, obj=None):
         """ Does the user have a specific permission? """
-        # Simplest possible answer: Yes, always
-        return True
+        # Like Django's `ModelBackend`: active superusers have them all and there are no object permissions
+        if self.is_active and self.is_superuser:
+            return True
+        if not self.is_active or obj is not None:
+            return False
+
+        mask = self.get_compiled_permissions().mask
+        return bool(mask & permission_index.bits.get(perm, 0))
 
     def has_module_perms(self, app_label):
         """ Does the user have permissions to view the app `app_label`? """
-        # Simplest possible answer: Yes, always
-        return True
+        if self.is_active and self.is_superuser:
+            return True
+        if not self.is_active:
+            return False
+
+        mask = self.get_compiled_permissions().mask
+        return bool(mask & permission_index.app_masks.get(app_label, 0))
 
 
 class VendorUser(UserAccount):
@@ -288,41 +610,119 @@ class VendorUser(UserAccount):
     category = models.CharField(max_length=255, blank=True, null=True)
 
 
-# def create_custom_permissions():
-#     content_type = ContentType.objects.get_for_model(UserAccount)
-
-#     # Permission for custom action
-#     custom_action_permission, _ = Permission.objects.get_or_create(
-#         codename="can_custom_action",
-#         name="Can perform a custom action",
-#         content_type=content_type
-#     )
-
-#     # Permission for staff-specific action
-#     staff_action_permission, _ = Permission.objects.get_or_create(
-#         codename="can_staff_action",
-#         name="Can perform a staff action",
-#         content_type=content_type
-#     )
-
-#     # Permission for vendor-specific action
-#     vendor_action_permission, _ = Permission.objects.get_or_create(
-#         codename="can_vendor_action",
-#         name="Can perform a vendor action",
-#         content_type=content_type
-#     )
-
-# create_custom_permissions()
-# normal_user_group, created = Group.objects.get_or_create(name="Normal User")
-# vendor_user_group, created = Group.objects.get_or_create(name="Vendor User")
-# staff_user_group, created = Group.objects.get_or_create(name="Staff User")
-# superuser_group, created = Group.objects.get_or_create(name="Superuser")
-
-# # Assign custom permissions to groups
-# custom_action_permission = Permission.objects.get(codename="can_custom_action")
-# vendor_action_permission = Permission.objects.get(codename="can_vendor_action")
-# staff_action_permission = Permission.objects.get(codename="can_staff_action")
-
-# normal_user_group.permissions.add(custom_action_permission)
-# vendor_user_group.permissions.add(custom_action_permission, vendor_action_permission)
-# staff_user_group.permissions.add(custom_action_permission, staff_action_permission)
+class RevokedToken(models.Model):
+    """
+    A JWT revoked before its expiry, by logout or refresh token rotation.
+
+    Rows are only needed until the token would have expired anyway and are pruned after that.
+
+    Fields:
+        jti (str): The token's unique identifier claim.
+        expires_at (datetime): When the token expires on its own.
+        revoked_at (datetime): When the token was revoked.
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(default=timezone.now)
+
+
+class OutboxEvent(models.Model):
+    """
+    A user lifecycle event waiting to be relayed to other services (see `msd.users.outbox`).
+
+    Rows are written in the transaction that changes the user, so an event exists if and only if the change was
+    committed, and are deleted once relayed.
+
+    Fields:
+        event_type (str): One of the `USER_*` event types.
+        user_id (int): The user the event is about, not a foreign key so that events outlive deleted users.
+        payload (dict): Small event specific data, always including the user's `profile_version` as `version`.
+        created_at (datetime): When the event happened.
+    """
+    USER_CREATED = 'user.created'
+    USER_UPDATED = 'user.updated'
+    USER_VERIFIED = 'user.verified'
+    USER_INVITED = 'user.invited'  # Asks for an activation email or login text, see `msd.users.registration`
+
+    event_type = models.CharField(max_length=64)
+    user_id = models.BigIntegerField()
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def to_message(self):
+        return {
+            'id': self.pk,
+            'type': self.event_type,
+            'user_id': self.user_id,
+            'payload': self.payload,
+            'created_at': self.created_at.isoformat(),
+        }
+
+
+class UserRollupManager(models.Manager):
+
+    def add(self, counts, using=None):
+        """
+        Add `counts`, a mapping of `get_rollup_key()` keys to amounts, to the counts of the rows.
+
+        They are written as `UserRollupDelta` rows, which concurrent signups insert without waiting for each other,
+        and folded into the rows in the background (see `msd.users.rollups.fold_rollup_deltas()`).
+        """
+        using = using or router.db_for_write(self.model)
+        UserRollupDelta.objects.using(using).bulk_create([
+            UserRollupDelta(**dict(zip(ROLLUP_DIMENSIONS, key)), count=amount)
+            for key, amount in counts.items()
+            if amount
+        ])
+
+
+# `UserRollup` key fields, the `get_rollup_key()` of users' `ROLLUP_FIELDS`
+ROLLUP_DIMENSIONS = ('day', 'is_vendor', 'gender', 'location', 'email_verified')
+
+
+class UserRollup(models.Model):
+    """
+    How many users there are per signup day and combination of demographic dimensions.
+
+    Kept up to date incrementally by `UserAccount.save()`, the bulk upsert and deletes through `UserRollupDelta`s, and
+    corrected by the `reconcile_user_rollups` command for any changes that bypass them, like queryset `update()`s.
+    Dashboards sum these rows and the pending deltas (see `msd.users.rollups`) instead of scanning the user table.
+
+    Fields:
+        day (date): The day the users signed up, in `TIME_ZONE`.
+        is_vendor (bool): Whether the users are vendors.
+        gender (str): The users' gender, empty if unknown.
+        location (str): The users' location.
+        email_verified (bool): Whether the users verified their email address.
+        count (int): The number of such users.
+    """
+    day = models.DateField()
+    is_vendor = models.BooleanField()
+    gender = models.CharField(max_length=10, blank=True)
+    location = models.CharField(max_length=255)
+    email_verified = models.BooleanField()
+    count = models.IntegerField(default=0)
+
+    objects = UserRollupManager()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=ROLLUP_DIMENSIONS, name='users_rollup_key')]
+
+
+class UserRollupDelta(models.Model):
+    """
+    A change to a `UserRollup` count not folded into it yet.
+
+    Signups append these instead of incrementing the count of their day, which every signup of the day would have
+    to wait for the row lock of. The `fold_user_rollups` command adds them to the counts and deletes them.
+
+    Fields:
+        day, is_vendor, gender, location, email_verified: The `UserRollup` key.
+        count (int): The amount to add to its count, negative for users deleted or no longer counted in it.
+    """
+    day = models.DateField()
+    is_vendor = models.BooleanField()
+    gender = models.CharField(max_length=10, blank=True)
+    location = models.CharField(max_length=255)
+    email_verified = models.BooleanField()
+    count = models.IntegerField()
@@ -0,0 +1,62 @@
+import json
+import os
+import queue
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .models import OutboxEvent
+
+
+class FileSink:
+    """
+    Append events as JSON lines to a file, a local stand-in for a message broker.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+
+    def send(self, messages):
+        with open(self.path, 'a') as file:
+            file.writelines(json.dumps(message) + '\n' for message in messages)
+            file.flush()
+            os.fsync(file.fileno())
+
+
+class QueueSink:
+    """
+    Put events on an in-process queue, for tests, benchmarks and local consumers.
+    """
+
+    def __init__(self, maxsize=0):
+        self.queue = queue.Queue(maxsize)
+
+    def send(self, messages):
+        for message in messages:
+            self.queue.put(message)
+
+
+def get_sink():
+    return import_string(settings.OUTBOX_SINK)(**settings.OUTBOX_SINK_OPTIONS)
+
+
+def relay_batch(sink, batch_size):
+    """
+    Send up to `batch_size` of the oldest outbox events to `sink` and delete them, returning how many were sent.
+
+    Rows are claimed with `SELECT ... FOR UPDATE SKIP LOCKED`, so several relays can drain the outbox side by side
+    without blocking each other or sending an event twice. If `sink` raises, the transaction rolls back and the
+    events are sent again by a later batch, i.e. delivery is at least once. Events of one user may be delivered out
+    of order across relays, consumers can order them by `version`.
+    """
+    with transaction.atomic():
+        events = list(OutboxEvent.objects.select_for_update(skip_locked=True).order_by('pk')[:batch_size])
+        if not events:
+            return 0
+
+        sink.send([event.to_message() for event in events])
+        OutboxEvent.objects.filter(pk__in=[event.pk for event in events]).delete()
+
+    return len(events)
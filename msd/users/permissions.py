@@ -0,0 +1,11 @@
+from rest_framework.permissions import BasePermission
+
+
+class CanBatchRegister(BasePermission):
+    """
+    Staff, and partner accounts granted the `users.can_batch_register` permission.
+    """
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and (user.is_staff or user.has_perm('users.can_batch_register')))
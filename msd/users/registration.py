@@ -0,0 +1,165 @@
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core import exceptions
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.utils.translation import gettext as _
+from djoser.conf import settings as djoser_settings
+from djoser.utils import encode_uid
+from rest_framework.settings import api_settings
+
+from .models import OutboxEvent, UserAccount, normalize_mobile_number
+
+CREATED = 'created'
+EXISTS = 'exists'
+INVALID = 'invalid'
+CONFLICT = 'conflict'
+
+REGISTRATION_FIELDS = {'email', 'mobile_number', 'first_name', 'last_name'}
+
+
+def normalize_email(email):
+    validate_email(email)
+    return UserAccount.objects.normalize_email(email).lower()
+
+
+NORMALIZERS = {'email': normalize_email, 'mobile_number': normalize_mobile_number}
+
+
+def clean_registration(item):
+    """
+    Validate one batch item and return it as normalized `create_user()` arguments.
+
+    Raises:
+        exceptions.ValidationError: With the errors by field.
+    """
+    errors = {}
+    for field, value in item.items():
+        if field not in REGISTRATION_FIELDS:
+            errors[field] = [_('Unknown field.')]
+        elif value is not None and not isinstance(value, str):
+            errors[field] = [_('Not a string.')]
+
+    kwargs = {field: value for field, value in item.items() if value and field not in errors}
+    if 'email' not in kwargs and 'mobile_number' not in kwargs:
+        errors[api_settings.NON_FIELD_ERRORS_KEY] = [_('Please provide an email address or mobile number.')]
+
+    for field, normalize in NORMALIZERS.items():
+        try:
+            if field in kwargs:
+                kwargs[field] = normalize(kwargs[field])
+        except exceptions.ValidationError as ex:
+            errors[field] = ex.messages
+
+    if errors:
+        raise exceptions.ValidationError(errors)
+
+    # Like djoser's signup, email accounts stay inactive until activated
+    kwargs['is_active'] = 'email' not in kwargs or not djoser_settings.SEND_ACTIVATION_EMAIL
+    return kwargs
+
+
+def make_invitation(user):
+    """
+    Return the unsaved outbox event asking for a newly registered user to be sent their activation email or, for
+    mobile only accounts, a text to log in with a one-time code.
+    """
+    if user.email is not None:
+        payload = {'channel': 'email', 'email': user.email}
+        if not user.is_active:
+            payload.update(uid=encode_uid(user.pk), token=default_token_generator.make_token(user))
+    else:
+        payload = {'channel': 'sms', 'mobile_number': user.mobile_number}
+
+    return OutboxEvent(
+        event_type=OutboxEvent.USER_INVITED, user_id=user.pk, payload={
+            **payload, 'version': user.profile_version
+        }
+    )
+
+
+def resolve_mobile_numbers(registrations):
+    """
+    Return the indexes of the registrations the upsert would fail on, those with an email address and a mobile number
+    that is someone else's, and the ids of the existing users of those with only a mobile number, by index.
+
+    A number is someone else's when an existing user or an earlier registration of the batch has it.
+    """
+    mobile_numbers = [kwargs['mobile_number'] for _index, kwargs in registrations if 'mobile_number' in kwargs]
+    users = UserAccount.objects.filter(mobile_number__in=mobile_numbers)
+    owners = {number: (pk, email) for number, pk, email in users.values_list('mobile_number', 'pk', 'email')}
+
+    conflicts = set()
+    existing = {}
+    for index, kwargs in registrations:
+        mobile_number = kwargs.get('mobile_number')
+        if mobile_number is None:
+            continue
+
+        pk, email = owners.setdefault(mobile_number, (None, kwargs.get('email')))
+        if 'email' not in kwargs:
+            # Left to the upsert when the owner is registered by this batch too
+            if pk is not None:
+                existing[index] = pk
+        elif email != kwargs['email']:
+            conflicts.add(index)
+
+    return conflicts, existing
+
+
+def register_users(items):
+    """
+    Register users in bulk, e.g. for a partner integration, returning a result for each of `items`.
+
+    Items are validated up front, then inserted `BATCH_REGISTRATION_CHUNK_SIZE` at a time with one multi-row upsert
+    per chunk (see `UserAccountManager.bulk_upsert_users()`). Invitations for the created users are written to the
+    outbox in the same transaction, to be sent by whichever service consumes it.
+
+    Args:
+        items (list): Dicts of `email` and/or `mobile_number`, and optionally `first_name` and `last_name`.
+
+    Returns:
+        list: For each item, a dict of its `status` (`created`, `exists`, `invalid` or `conflict`) and either the
+            user's `id` or the `errors` by field.
+    """
+    results = [None] * len(items)
+    registrations = []
+    for index, item in enumerate(items):
+        try:
+            registrations.append((index, clean_registration(item)))
+        except exceptions.ValidationError as ex:
+            results[index] = {'status': INVALID, 'errors': ex.message_dict}
+
+    conflicts, existing = resolve_mobile_numbers(registrations)
+    for index in conflicts:
+        results[index] = {'status': CONFLICT, 'errors': {'mobile_number': [_('Taken by another account.')]}}
+    for index, pk in existing.items():
+        results[index] = {'status': EXISTS, 'id': pk}
+    registrations = [(index, kwargs) for index, kwargs in registrations if results[index] is None]
+
+    registrations = iter(registrations)
+    while chunk := list(islice(registrations, settings.BATCH_REGISTRATION_CHUNK_SIZE)):
+        # Items were validated and mobile numbers resolved above, only a concurrent registration can fail the upsert
+        try:
+            with transaction.atomic():
+                pairs = UserAccount.objects.bulk_upsert_users([kwargs for _index, kwargs in chunk])
+
+                # Items repeating an earlier one get the same pair, only the first one counts as created
+                invitations = []
+                seen = set()
+                for (index, _kwargs), (user, created) in zip(chunk, pairs):
+                    created = created and user.pk not in seen
+                    seen.add(user.pk)
+                    results[index] = {'status': CREATED if created else EXISTS, 'id': user.pk}
+                    if created:
+                        invitations.append(make_invitation(user))
+
+                OutboxEvent.objects.bulk_create(invitations)
+        except IntegrityError:
+            # A mobile number of the chunk was taken by a concurrent registration, the client can retry these
+            for index, _kwargs in chunk:
+                results[index] = {'status': CONFLICT, 'errors': {'mobile_number': [_('Taken by another account.')]}}
+
+    return results
@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from msd.core.utils.bloom import BloomFilter
+
+from .models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRevocationList:
+    """
+    Process local view of revoked token `jti`s.
+
+    Every worker keeps a Bloom filter of the non-expired `RevokedToken` rows and rebuilds it every
+    `TOKEN_REVOCATION_REBUILD_INTERVAL` seconds, so the common case (a token that was never revoked) is answered
+    from memory and the database is only consulted when the filter reports a possible hit. Tokens revoked by this
+    worker are added to its filter immediately, and to every rebuilt one until a rebuild finds their row, which may
+    not be committed yet when it reads the table. Other workers pick them up on their next rebuild. Rebuilds run on a
+    thread of their own, outside the transaction of the request that found the filter due.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = BloomFilter(0)
+        self._confirmed = set()
+        # `jti`s revoked by this worker and their expiry, guarded by `_revoked_lock`
+        self._revoked = {}
+        self._revoked_lock = threading.Lock()
+        self._rebuild_at = 0.0
+        self._prune_at = 0.0
+
+    def revoke(self, token):
+        jti = token[api_settings.JTI_CLAIM]
+        expires_at = datetime_from_epoch(token['exp'])
+        RevokedToken.objects.bulk_create([RevokedToken(jti=jti, expires_at=expires_at)], ignore_conflicts=True)
+
+        with self._revoked_lock:
+            self._revoked[jti] = expires_at
+            self._filter.add(jti)
+        # Until then the row may still be rolled back, and the database is asked
+        transaction.on_commit(lambda: self._confirmed.add(jti))
+
+    def is_revoked(self, jti):
+        if time.monotonic() >= self._rebuild_at:
+            # Only the very first build is waited for, until then there is nothing to answer from
+            self.rebuild_in_background(wait=not self._rebuild_at)
+
+        if jti not in self._filter:
+            return False
+
+        if jti in self._confirmed:
+            return True
+
+        if RevokedToken.objects.filter(jti=jti).exists():
+            self._confirmed.add(jti)
+            return True
+
+        return False
+
+    def rebuild_in_background(self, wait=False):
+        if not wait and self._lock.locked():
+            return
+
+        thread = threading.Thread(target=self.rebuild_on_thread, args=(wait,), daemon=True)
+        thread.start()
+        if wait:
+            thread.join()
+
+    def rebuild_on_thread(self, blocking):
+        try:
+            self.rebuild(blocking)
+        except Exception:
+            # Retried by the next lookup, answering from the current filter meanwhile
+            logger.exception('Could not rebuild the token revocation list')
+        finally:
+            # Connections are per thread and every rebuild runs on a new one
+            connections.close_all()
+
+    def rebuild(self, blocking=True):
+        if not self._lock.acquire(blocking=blocking):
+            # Another thread is already rebuilding, keep answering from the current filter meanwhile
+            return
+
+        try:
+            if time.monotonic() < self._rebuild_at:
+                return
+
+            now = timezone.now()
+            if time.monotonic() >= self._prune_at:
+                self.prune(now)
+
+            jtis = list(RevokedToken.objects.filter(expires_at__gt=now).values_list('jti', flat=True))
+            bloom_filter = BloomFilter(
+                max(len(jtis) * 2, settings.TOKEN_REVOCATION_BLOOM_CAPACITY), settings.TOKEN_REVOCATION_ERROR_RATE
+            )
+            for jti in jtis:
+                bloom_filter.add(jti)
+
+            loaded = set(jtis)
+            with self._revoked_lock:
+                # Revoked meanwhile or not committed before the query, and not in the new filter otherwise
+                self._revoked = {
+                    jti: expires_at
+                    for jti, expires_at in self._revoked.items()
+                    if expires_at > now and jti not in loaded
+                }
+                for jti in self._revoked:
+                    bloom_filter.add(jti)
+
+                self._filter = bloom_filter
+            self._confirmed = set()
+            self._rebuild_at = time.monotonic() + settings.TOKEN_REVOCATION_REBUILD_INTERVAL
+        finally:
+            self._lock.release()
+
+    def prune(self, now=None):
+        RevokedToken.objects.filter(expires_at__lte=now or timezone.now()).delete()
+        self._prune_at = time.monotonic() + settings.TOKEN_REVOCATION_PRUNE_INTERVAL
+
+
+revocation_list = TokenRevocationList()
@@ -0,0 +1,117 @@
+import threading
+from typing import NamedTuple
+
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.db.models import Q
+
+from .caching import cache_permissions, get_cached_permissions, get_permissions_generation
+
+PERMISSIONS_CLAIM = 'permissions'
+
+
+class CompiledPermissions(NamedTuple):
+    """
+    A user's effective permissions as a bitmask (bits assigned by `PermissionIndex`), with what it was compiled from.
+
+    It is only valid while both the permissions generation (bumped on any group or permission change, see
+    `msd.users.signals`) and the user's `profile_version` (bumped when role flags like `is_staff` change) match.
+    """
+    generation: int
+    version: int
+    mask: int
+
+    def is_current(self, generation, user):
+        return self.generation == generation and self.version == user.profile_version
+
+
+class PermissionIndex:
+    """
+    Map permissions to their bit in the masks, numbered densely in `'app_label.codename'` order.
+
+    Masks are as long as there are permissions rather than as the highest primary key, which keeps the ones carried
+    in access tokens short. The numbering changes with the permissions, and with it the permissions generation, so
+    masks are only ever read with the index of the generation they were compiled for. The index is loaded once per
+    process and reloaded when the generation changes.
+    """
+
+    def __init__(self):
+        self.generation = None
+        self.bits = {}
+        self.pk_bits = {}
+        self.app_masks = {}
+        self.lock = threading.Lock()
+
+    def refresh(self, generation):
+        if generation == self.generation:
+            return
+
+        with self.lock:
+            if generation == self.generation:
+                return
+
+            bits = {}
+            pk_bits = {}
+            app_masks = {}
+            permissions = sorted(Permission.objects.values_list('content_type__app_label', 'codename', 'pk'))
+            for index, (app_label, codename, pk) in enumerate(permissions):
+                bit = 1 << index
+                bits[f'{app_label}.{codename}'] = bit
+                pk_bits[pk] = bit
+                app_masks[app_label] = app_masks.get(app_label, 0) | bit
+
+            self.bits, self.pk_bits, self.app_masks, self.generation = bits, pk_bits, app_masks, generation
+
+
+permission_index = PermissionIndex()
+
+
+def get_role_group_names(user):
+    # Groups a user belongs to by role (`USER_ROLE_GROUPS`), on top of the groups they were added to
+    return [name for name, flag in settings.USER_ROLE_GROUPS if flag is None or getattr(user, flag)]
+
+
+def compile_permission_mask(user):
+    # With the index of the current generation, `get_permissions()` refreshes it first
+    permission_ids = Permission.objects.filter(
+        Q(user=user) | Q(group__user=user) | Q(group__name__in=get_role_group_names(user))
+    ).values_list('pk', flat=True).distinct()
+
+    mask = 0
+    for permission_id in permission_ids:
+        # Permissions created since the index was loaded are not granted until the generation bump reloads it
+        mask |= permission_index.pk_bits.get(permission_id, 0)
+    return mask
+
+
+def get_permissions(user):
+    """
+    Return the user's current `CompiledPermissions`.
+
+    Taken from the access token when it carries current ones, then from the cache, and compiled (one query)
+    otherwise.
+    """
+    generation = get_permissions_generation()
+    permission_index.refresh(generation)
+
+    compiled = getattr(user, '_token_permissions', None)
+    if compiled is None or not compiled.is_current(generation, user):
+        compiled = get_cached_permissions(user.pk)
+
+        if compiled is None or not compiled.is_current(generation, user):
+            compiled = CompiledPermissions(generation, user.profile_version, compile_permission_mask(user))
+            cache_permissions(user.pk, compiled)
+
+    return compiled
+
+
+def to_claim(compiled):
+    return [compiled.generation, compiled.version, format(compiled.mask, 'x')]
+
+
+def from_claim(claim):
+    try:
+        generation, version, mask = claim
+        return CompiledPermissions(generation, version, int(mask, 16))
+    except (TypeError, ValueError):
+        return None
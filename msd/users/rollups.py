@@ -0,0 +1,133 @@
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from itertools import chain
+
+from django.db import connections, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from msd.core.utils.db import increment_counters
+
+from .models import ROLLUP_DIMENSIONS, ROLLUP_FIELDS, UserAccount, UserRollup, UserRollupDelta, get_rollup_key
+
+# Key of the PostgreSQL advisory lock reconciliations take turns with
+RECONCILE_LOCK_ID = 0x75726f6c
+
+
+def count_users(day, using='default'):
+    # The `UserRollup` counts of `day` computed from scratch, an index range scan of that day's signups
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    users = UserAccount.objects.using(using).filter(created_at__gte=start, created_at__lt=start + timedelta(days=1))
+
+    counts = Counter()
+    for row in users.values(*ROLLUP_FIELDS[1:]).annotate(count=Count('pk')).order_by():
+        counts[get_rollup_key((start, *(row[field] for field in ROLLUP_FIELDS[1:])))] += row['count']
+    return counts
+
+
+def get_stored_counts(day, using='default'):
+    # The `UserRollup` counts of `day` with the deltas not folded into them yet
+    counts = Counter()
+    for model in (UserRollup, UserRollupDelta):
+        rows = model.objects.using(using).filter(day=day).values(*ROLLUP_DIMENSIONS).annotate(total=Sum('count'))
+        for row in rows.order_by():
+            counts[tuple(row[dimension] for dimension in ROLLUP_DIMENSIONS)] += row['total']
+    return counts
+
+
+@contextmanager
+def reconcile_lock(using):
+    # Taken before the snapshot of a reconciliation, so that it sees the corrections of the one before
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        yield
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_lock(%s)', [RECONCILE_LOCK_ID])
+        try:
+            yield
+        finally:
+            cursor.execute('SELECT pg_advisory_unlock(%s)', [RECONCILE_LOCK_ID])
+
+
+def reconcile_day(day, using='default'):
+    """
+    Correct the `UserRollup` counts of `day` to match the user table, returning how many counts were wrong.
+
+    The users and the counts are read from one `REPEATABLE READ` snapshot, in which every signup is either counted in
+    both or in neither, and the differences are added as `UserRollupDelta`s. So signups go on meanwhile, they are
+    neither locked out nor lost. Reconciliations take turns, the same difference must not be added twice.
+    """
+    with reconcile_lock(using), transaction.atomic(using=using, durable=True):
+        connection = connections[using]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+
+        actual = count_users(day, using)
+        stored = get_stored_counts(day, using)
+        corrections = {key: actual[key] - stored[key] for key in actual.keys() | stored.keys()}
+        corrections = {key: amount for key, amount in corrections.items() if amount}
+        UserRollup.objects.add(corrections, using)
+
+    return len(corrections)
+
+
+def fold_rollup_deltas(batch_size, using='default'):
+    """
+    Add up to `batch_size` of the oldest `UserRollupDelta`s to the `UserRollup` counts and delete them, returning how
+    many were folded.
+
+    Deltas locked by another fold are skipped, so folds can run side by side. Counts are incremented in key order
+    (see `increment_counters()`), so they don't deadlock either.
+    """
+    with transaction.atomic(using=using):
+        deltas = UserRollupDelta.objects.using(using).select_for_update(skip_locked=True).order_by('pk')
+        rows = list(deltas.values_list('pk', *ROLLUP_DIMENSIONS, 'count')[:batch_size])
+
+        counts = Counter()
+        for _pk, *key, count in rows:
+            counts[tuple(key)] += count
+        increment_counters(UserRollup, counts, ROLLUP_DIMENSIONS, 'count', using)
+        UserRollupDelta.objects.using(using).filter(pk__in=[row[0] for row in rows]).delete()
+
+    return len(rows)
+
+
+def get_user_stats(start, end):
+    """
+    Return signups per day and the breakdown by each dimension of the users who signed up from `start` to `end`.
+
+    Summed from the `UserRollup` rows and the `UserRollupDelta`s of the period, so the cost depends on the number of
+    days and dimension combinations, not on the number of users.
+    """
+    signups = Counter()
+    breakdowns = {dimension: Counter() for dimension in ROLLUP_DIMENSIONS[1:]}
+    rollups = UserRollup.objects.filter(day__range=(start, end)).exclude(count=0)
+    deltas = UserRollupDelta.objects.filter(day__range=(start, end))
+    for rollup in chain(rollups, deltas):
+        signups[rollup.day] += rollup.count
+        for dimension, counter in breakdowns.items():
+            counter[getattr(rollup, dimension)] += rollup.count
+
+    # Unary plus drops what adds up to nothing
+    signups = +signups
+    breakdowns = {dimension: +counter for dimension, counter in breakdowns.items()}
+
+    return {
+        'start': start,
+        'end': end,
+        'total': sum(signups.values()),
+        'signups': [{
+            'day': day,
+            'count': count
+        } for day, count in sorted(signups.items())],
+        'breakdowns': {
+            dimension: [{
+                'value': value,
+                'count': count
+            } for value, count in counter.most_common()] for dimension, counter in breakdowns.items()
+        },
+    }
@@ -0,0 +1,71 @@
+from typing import Annotated, Optional
+
+from django.core.exceptions import ValidationError
+from django.core.validators import ProhibitNullCharactersValidator, validate_email
+from pydantic import AfterValidator, BaseModel, BeforeValidator, ConfigDict, StringConstraints
+from rest_framework import serializers
+from rest_framework.utils.field_mapping import get_unique_error_message
+
+from msd.core.serializers import FIELD_ERROR_MESSAGES, fail
+
+from .models import UserAccount
+
+EMAIL_FIELD = UserAccount._meta.get_field('email')
+NULL_CHARACTERS = (ProhibitNullCharactersValidator.message, ProhibitNullCharactersValidator.code)
+
+
+def coerce_to_string(value):
+    # DRF's `CharField` takes numbers too
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return value
+
+
+def check_null_characters(value):
+    if '\x00' in value:
+        fail(NULL_CHARACTERS)
+    return value
+
+
+def check_email(value):
+    # The validators of the `email` field of a `ModelSerializer`, all reported together like DRF does
+    if not value:
+        return value
+
+    details = []
+    if len(value) > EMAIL_FIELD.max_length:
+        details.append((FIELD_ERROR_MESSAGES['max_length'].format(max_length=EMAIL_FIELD.max_length), 'max_length'))
+    if '\x00' in value:
+        details.append(NULL_CHARACTERS)
+    try:
+        validate_email(value)
+    except ValidationError:
+        details.append((serializers.EmailField.default_error_messages['invalid'], 'invalid'))
+    if details:
+        fail(*details)
+
+    if UserAccount.objects.filter(email=value).exists():
+        fail((get_unique_error_message(EMAIL_FIELD), 'unique'))
+    return value
+
+
+# String constraints go first, pydantic only applies them to plain `str` schemas, the validators wrap those
+Email = Annotated[str,
+                  StringConstraints(strip_whitespace=True),
+                  BeforeValidator(coerce_to_string),
+                  AfterValidator(check_email)]
+Password = Annotated[str,
+                     StringConstraints(strip_whitespace=True, min_length=1),
+                     BeforeValidator(coerce_to_string),
+                     AfterValidator(check_null_characters)]
+
+
+class RegistrationSchema(BaseModel):
+    """
+    The fields of djoser's `UserCreatePasswordRetypeSerializer`, which are only these as `REQUIRED_FIELDS` is empty.
+    """
+    model_config = ConfigDict(extra='ignore')
+
+    email: Optional[Email] = None
+    password: Password
+    re_password: Password
@@ -1,10 +1,30 @@
 import random
 import string
+from datetime import timedelta
 
 import boto3
-from rest_framework import serializers
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from djoser import serializers as djoser_serializers
+from rest_framework import exceptions, serializers
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer, TokenRefreshSerializer, TokenVerifySerializer
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import UntypedToken
 
-from .models import UserAccount
+from msd.core.serializers import PydanticValidationMixin
+
+from .activity import record_login
+from .geolocation import update_user_location
+from .models import UserAccount, normalize_mobile_number
+from .revocation import revocation_list
+from .roles import PERMISSIONS_CLAIM, to_claim
+from .schemas import RegistrationSchema
 
 
 class UserRegistrationSerializer(serializers.Serializer):
@@ -44,3 +64,126 @@ class UserRegistrationSerializer(serializers.Serializer):
         user = UserAccount(mobile_number=mobile_number)
         user.save()
         return user
+
+
+class UserCreatePasswordRetypeSerializer(
+    PydanticValidationMixin, djoser_serializers.UserCreatePasswordRetypeSerializer
+):
+    # Signup, with its fields validated by `RegistrationSchema`
+    schema = RegistrationSchema
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+
+        # `create_user()` checks the policy too, but failing there would be a server error rather than a field error
+        try:
+            UserAccount.objects.validate_password(attrs['password'])
+        except DjangoValidationError as ex:
+            raise serializers.ValidationError({'password': ex.messages})
+
+        return attrs
+
+
+class BatchRegistrationSerializer(serializers.Serializer):
+    # Items are validated one by one by `register_users()`, so that one bad item doesn't fail the whole batch
+    users = serializers.ListField(
+        child=serializers.DictField(), allow_empty=False, max_length=settings.BATCH_REGISTRATION_MAX_USERS
+    )
+
+
+class UserStatsSerializer(serializers.Serializer):
+    # Signup days of the period, the last 30 by default
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        end = attrs.get('end') or timezone.localdate()
+        start = attrs.get('start') or end - timedelta(days=29)
+        if start > end:
+            raise serializers.ValidationError(_('The start must not be after the end.'))
+        return {'start': start, 'end': end}
+
+
+class TokenIntrospectionSerializer(serializers.Serializer):
+    # Tokens are checked one by one, so that one bad token doesn't fail the whole batch
+    tokens = serializers.ListField(
+        child=serializers.CharField(max_length=4096),
+        allow_empty=False,
+        max_length=settings.TOKEN_INTROSPECTION_MAX_TOKENS,
+    )
+
+
+class LogoutSerializer(serializers.Serializer):
+    # Optional, browsers send the refresh token as a cookie instead
+    refresh = serializers.CharField(required=False)
+
+
+class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        if settings.PERMISSIONS_IN_TOKEN:
+            token[PERMISSIONS_CLAIM] = to_claim(user.get_compiled_permissions())
+        return token
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        record_login(self.user)
+        update_user_location(self.user, self.context['request'])
+        return data
+
+
+class MobileTokenObtainPairSerializer(CustomTokenObtainPairSerializer):
+    """
+    Obtain tokens with a mobile number and the one-time code sent to it (see `MobileOTPBackend`).
+    """
+    username_field = 'mobile_number'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        del self.fields['password']
+        self.fields['otp'] = serializers.CharField(write_only=True, max_length=6)
+
+    def validate(self, attrs):
+        self.user = authenticate(self.context.get('request'), mobile_number=attrs['mobile_number'], otp=attrs['otp'])
+        if not api_settings.USER_AUTHENTICATION_RULE(self.user):
+            raise exceptions.AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        refresh = self.get_token(self.user)
+        record_login(self.user)
+        update_user_location(self.user, self.context['request'])
+        return {'refresh': str(refresh), 'access': str(refresh.access_token)}
+
+
+class MobileOTPSerializer(serializers.Serializer):
+    mobile_number = serializers.CharField(max_length=32)
+
+    def validate_mobile_number(self, value):
+        return normalize_mobile_number(value)
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if revocation_list.is_revoked(refresh[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is revoked'))
+
+        data = super().validate(attrs)
+
+        # With rotation the old refresh token must stop working as soon as the new one is issued
+        if 'refresh' in data:
+            revocation_list.revoke(refresh)
+
+        return data
+
+
+class CustomTokenVerifySerializer(TokenVerifySerializer):
+
+    def validate(self, attrs):
+        token = UntypedToken(attrs['token'])
+        if revocation_list.is_revoked(token[api_settings.JTI_CLAIM]):
+            raise serializers.ValidationError(_('Token is revoked'))
+
+        return super().validate(attrs)
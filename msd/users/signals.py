@@ -0,0 +1,62 @@
+from django.contrib.auth.models import Group, Permission
+from django.contrib.auth.signals import user_logged_in
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from djoser.signals import user_activated, user_registered
+
+from .activity import record_login
+from .caching import bump_permissions_generation, invalidate_user
+from .geolocation import update_user_location
+from .models import UserAccount, UserRollup, VendorUser, get_rollup_key
+
+
+# Senders listed rather than receiving from every model: a `post_delete` receiver of a model stops Django from
+# deleting its rows in bulk (see `Collector.can_fast_delete()`)
+@receiver(post_save, sender=UserAccount)
+@receiver(post_delete, sender=UserAccount)
+@receiver(post_save, sender=VendorUser)
+@receiver(post_delete, sender=VendorUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=UserAccount)
+def remove_deleted_user_from_rollups(sender, instance, using, **kwargs):
+    # Only for `UserAccount` rows, deleting a `VendorUser` sends this for its parent row as well
+    UserRollup.objects.add({get_rollup_key(instance.get_rollup_values()): -1}, using)
+
+
+# Session logins are buffered like all others instead of an UPDATE each (see `msd.users.activity`)
+user_logged_in.disconnect(dispatch_uid='update_last_login')
+
+
+@receiver(user_logged_in)
+def record_session_login(sender, user, **kwargs):
+    record_login(user)
+
+
+@receiver(user_registered)
+def set_registered_user_location(sender, user, request, **kwargs):
+    update_user_location(user, request)
+
+
+@receiver(user_activated)
+def verify_activated_email(sender, user, request, **kwargs):
+    # Activating follows the link emailed to the address, which is what verifies it
+    if not user.email_verified:
+        user.email_verified = True
+        user.save(update_fields=['email_verified'])
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(m2m_changed, sender=Group.permissions.through)
+@receiver(m2m_changed, sender=UserAccount.groups.through)
+@receiver(m2m_changed, sender=UserAccount.user_permissions.through)
+def invalidate_compiled_permissions(sender, action=None, **kwargs):
+    # After commit, so that nothing recompiles from the old rows under the new generation
+    if action is None or action.startswith('post_'):
+        transaction.on_commit(bump_permissions_generation)
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+from msd.core.utils import jws
+
+
+class Ed25519TokenBackend(TokenBackend):
+    """
+    Sign tokens with the first of `signing_keys` and accept those of all of them, published by `JSONWebKeySetView`.
+
+    Services holding the key set verify our tokens locally (see `msd.core.utils.jws.KeySetClient`). Tokens signed
+    with `SECRET_KEY` before switching to Ed25519 are still accepted if `accept_hmac` is set.
+    """
+
+    def __init__(self, signing_keys, accept_hmac=False):
+        super().__init__(
+            api_settings.ALGORITHM,
+            api_settings.SIGNING_KEY,
+            leeway=api_settings.LEEWAY,
+            json_encoder=api_settings.JSON_ENCODER,
+        )
+        # `signing_key` remains the HMAC secret, which the parent verifies HMAC tokens with
+        self.ed25519_signing_key = signing_keys[0]
+        self.verify_keys = {jws.get_key_id(key.verify_key): key.verify_key for key in signing_keys}
+        self.accept_hmac = accept_hmac
+
+    def get_jwks(self):
+        return {'keys': [jws.to_jwk(verify_key) for verify_key in self.verify_keys.values()]}
+
+    def encode(self, payload):
+        return jws.encode(payload, self.ed25519_signing_key, self.json_encoder)
+
+    def decode(self, token, verify=True):
+        if isinstance(token, bytes):
+            # From the `Authorization` header
+            token = token.decode('latin-1')
+
+        try:
+            if self.accept_hmac and jws.get_header(token).get('alg') == api_settings.ALGORITHM:
+                return super().decode(token, verify)
+            return jws.decode(token, self.verify_keys, self.get_leeway().total_seconds(), verify)
+        except jws.InvalidToken as error:
+            raise TokenBackendError(_('Token is invalid or expired')) from error
+
+
+def get_token_backend():
+    """
+    Return the `Ed25519TokenBackend` for `JWT_SIGNING_KEYS`, or None to keep signing with HMAC and `SECRET_KEY`.
+    """
+    if not settings.JWT_SIGNING_KEYS:
+        return None
+    return Ed25519TokenBackend([jws.load_signing_key(seed) for seed in settings.JWT_SIGNING_KEYS],
+                               settings.JWT_ACCEPT_HMAC_TOKENS)
+
+
+def get_jwks():
+    token_backend = Token._token_backend
+    if not isinstance(token_backend, Ed25519TokenBackend):
+        return {'keys': []}
+    return token_backend.get_jwks()
@@ -0,0 +1,21 @@
+import sys
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class ConsoleSMSBackend:
+    """
+    Write text messages to stdout instead of sending them, like Django's console email backend.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, mobile_number, message):
+        self.stream.write(f'SMS to {mobile_number}: {message}\n')
+        self.stream.flush()
+
+
+def send_sms(mobile_number, message):
+    import_string(settings.SMS_BACKEND)(**settings.SMS_BACKEND_OPTIONS).send(mobile_number, message)
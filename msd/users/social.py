@@ -0,0 +1,100 @@
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from social_core.backends import facebook, google
+from social_core.backends.oauth import BaseOAuth2
+from social_core.exceptions import AuthFailed
+from social_core.utils import user_agent
+
+_local = threading.local()
+
+
+def get_session():
+    """
+    Return the keep-alive HTTP session used for provider calls, one per thread.
+
+    Sessions are created lazily so that pooled connections are never inherited across a fork of the WSGI server.
+    """
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=settings.SOCIAL_AUTH_HTTP_POOL_CONNECTIONS,
+            pool_maxsize=settings.SOCIAL_AUTH_HTTP_POOL_MAXSIZE,
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        _local.session = session
+
+    return session
+
+
+class PooledRequestsMixin:
+    """
+    Send social_core's outbound provider calls through a shared keep-alive session.
+
+    social_core opens a brand new connection (TCP and TLS handshake) for every call it makes, and a login makes
+    several of them. Reusing pooled connections to the provider takes those handshakes off the request path.
+    Set `SOCIAL_AUTH_POOLED_REQUESTS = False` to fall back to social_core's behaviour.
+    """
+
+    def request(self, url, method='GET', *args, **kwargs):
+        if not self.setting('POOLED_REQUESTS', True):
+            return super().request(url, method, *args, **kwargs)
+
+        kwargs.setdefault('headers', {})
+        kwargs.setdefault('timeout', self.setting('REQUESTS_TIMEOUT') or self.setting('URLOPEN_TIMEOUT'))
+        if self.setting('PROXIES') is not None:
+            kwargs.setdefault('proxies', self.setting('PROXIES'))
+        if self.setting('VERIFY_SSL') is not None:
+            kwargs.setdefault('verify', self.setting('VERIFY_SSL'))
+        if self.SEND_USER_AGENT and 'User-Agent' not in kwargs['headers']:
+            kwargs['headers']['User-Agent'] = self.setting('USER_AGENT') or user_agent()
+
+        try:
+            response = get_session().request(method, url, *args, **kwargs)
+        except requests.ConnectionError as ex:
+            raise AuthFailed(self, str(ex))
+
+        response.raise_for_status()
+        return response
+
+
+class GoogleOAuth2(PooledRequestsMixin, google.GoogleOAuth2):
+    pass
+
+
+class FacebookOAuth2(PooledRequestsMixin, facebook.FacebookOAuth2):
+    pass
+
+
+class FakeOAuth2(PooledRequestsMixin, BaseOAuth2):
+    """
+    Backend for the local fake provider in `msd.users.fake_oauth`, only enabled in `DEV_MODE`.
+
+    Point `SOCIAL_AUTH_FAKE_OAUTH2_BASE_URL` at a running `FakeOAuthProvider`.
+    """
+    name = 'fake-oauth2'
+    ACCESS_TOKEN_METHOD = 'POST'
+    REDIRECT_STATE = False
+
+    def authorization_url(self):
+        return f'{self.setting("BASE_URL")}/authorize'
+
+    def access_token_url(self):
+        return f'{self.setting("BASE_URL")}/token'
+
+    def user_data(self, access_token, *args, **kwargs):
+        return self.get_json(
+            f'{self.setting("BASE_URL")}/userinfo', headers={'Authorization': f'Bearer {access_token}'}
+        )
+
+    def get_user_details(self, response):
+        return {
+            'username': response['email'].split('@', 1)[0],
+            'email': response['email'],
+            'first_name': response.get('first_name', ''),
+            'last_name': response.get('last_name', ''),
+        }
@@ -0,0 +1,248 @@
+"""
+Synthetic user populations for measuring index, pagination and query changes at production scale.
+
+Users are generated in batches, each from a random generator seeded by the seed and the batch's first user, so the
+same seed, count, offset and batch size always produce the same users, with times relative to when they were
+generated. Signup times also depend on the number the run ends at (`offset + count`), they are spread over the users
+up to it: a population loaded in several runs starting on batch boundaries has the same users as one loaded in one
+run, except for when they signed up.
+
+Rows are streamed into PostgreSQL with `COPY`, skipping `save()`: no outbox events are written and the user rollups
+are added up per batch instead.
+
+Emails are under the reserved `.test` TLD, but mobile numbers are made up in real numbering ranges, so never point a
+real SMS backend at a synthetic population.
+"""
+import io
+import math
+import random
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import ROLLUP_FIELDS, UserAccount, UserRollup, VendorUser, get_rollup_key
+
+# Synthetic users are told apart by their username, every one of them can log in with `SYNTHETIC_PASSWORD`
+SYNTHETIC_USERNAME_PREFIX = 'synthetic-'
+SYNTHETIC_PASSWORD = 'Synthetic#2024'
+
+FIRST_NAMES = [
+    'James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David', 'Elizabeth', 'William',
+    'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah', 'Carlos', 'Maria', 'Wei', 'Priya', 'Ahmed',
+    'Fatima', 'Hiroshi', 'Yuki', 'Olga', 'Ivan', 'Aisha', 'Mohammed', 'Lucas', 'Sofia', 'Arjun', 'Ananya', 'Chen',
+    'Mei', 'Kwame', 'Amara', 'Liam', 'Emma'
+]
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+    'Hernandez', 'Lopez', 'Wilson', 'Anderson', 'Taylor', 'Thomas', 'Moore', 'Jackson', 'Martin', 'Lee', 'Patel',
+    'Sharma', 'Singh', 'Kumar', 'Wang', 'Li', 'Zhang', 'Liu', 'Nguyen', 'Kim', 'Tanaka', 'Sato', 'Ivanov', 'Silva',
+    'Santos', 'Mensah', 'Okafor', 'Khan', 'Ali', 'Murphy'
+]
+STREETS = ['Main', 'Oak', 'Pine', 'Maple', 'Cedar', 'Elm', 'Park', 'Lake', 'Hill', 'Church', 'High', 'Station']
+
+# The choices below are `(value, weight)` pairs
+EMAIL_DOMAINS = [('gmail.test', 45), ('yahoo.test', 12), ('outlook.test', 10), ('hotmail.test', 8), ('icloud.test', 6),
+                 ('company.test', 5), ('university.test', 3), ('proton.test', 2), ('aol.test', 2), ('startup.test', 2),
+                 ('agency.test', 2), ('mail.test', 1), ('studio.test', 1), ('family.test', 1)]
+# Locations as `msd.users.geolocation` formats them, with their coordinates and the start of their mobile numbers:
+# the country calling code and a national prefix, followed by `MOBILE_NUMBER_DIGITS` digits
+LOCATIONS = [
+    (('New York, New York, US', 40.7128, -74.0060, '1917'), 14),
+    (('Los Angeles, California, US', 34.0522, -118.2437, '1213'), 10),
+    (('Chicago, Illinois, US', 41.8781, -87.6298, '1312'), 6),
+    (('Houston, Texas, US', 29.7604, -95.3698, '1713'), 5),
+    (('Toronto, Ontario, CA', 43.6532, -79.3832, '1416'), 4),
+    (('London, England, GB', 51.5074, -0.1278, '447700'), 8),
+    (('Manchester, England, GB', 53.4808, -2.2426, '447800'), 2),
+    (('Berlin, Berlin, DE', 52.5200, 13.4050, '49151'), 3),
+    (('Paris, Ile-de-France, FR', 48.8566, 2.3522, '3361'), 3),
+    (('Madrid, Madrid, ES', 40.4168, -3.7038, '3461'), 2),
+    (('Mumbai, Maharashtra, IN', 19.0760, 72.8777, '91981'), 8),
+    (('Bengaluru, Karnataka, IN', 12.9716, 77.5946, '91961'), 6),
+    (('Delhi, Delhi, IN', 28.7041, 77.1025, '91991'), 5),
+    (('Sao Paulo, Sao Paulo, BR', -23.5505, -46.6333, '55119'), 4),
+    (('Mexico City, CDMX, MX', 19.4326, -99.1332, '5255'), 3),
+    (('Lagos, Lagos, NG', 6.5244, 3.3792, '234803'), 3),
+    (('Nairobi, Nairobi, KE', -1.2921, 36.8219, '254712'), 2),
+    (('Tokyo, Tokyo, JP', 35.6762, 139.6503, '8190'), 4),
+    (('Singapore, Singapore, SG', 1.3521, 103.8198, '659'), 2),
+    (('Sydney, New South Wales, AU', -33.8688, 151.2093, '614'), 3),
+]
+MOBILE_NUMBER_DIGITS = 7  # Unique up to 10 million users per location
+UNKNOWN_LOCATION_RATE = 0.1  # Signed up from an address missing from the GeoIP database
+GENDERS = [('Male', 44), ('Female', 44), ('Other', 2), (None, 10)]
+VENDOR_CATEGORIES = [('Food', 25), ('Retail', 20), ('Services', 15), ('Health', 10), ('Beauty', 8), ('Home', 8),
+                     ('Electronics', 6), ('Travel', 4), ('Education', 3), (None, 1)]
+
+USER_COLUMNS = (
+    'id', 'password', 'last_login', 'first_name', 'last_name', 'username', 'email', 'date_of_birth', 'is_active',
+    'is_staff', 'is_vendor', 'is_superuser', 'address', 'gender', 'profile_picture', 'mobile_number', 'email_verified',
+    'phone_verified', 'created_at', 'location', 'is_routable', 'verification_code', 'verification_code_expiry',
+    'latitude', 'longitude', 'profile_version', 'updated_at'
+)
+VENDOR_COLUMNS = ('useraccount_ptr_id', 'vendor_name', 'category')
+# Where the `ROLLUP_FIELDS` are in generated users, which lack the leading id and password
+ROLLUP_INDEXES = [USER_COLUMNS.index(field) - 2 for field in ROLLUP_FIELDS]
+
+
+class Choices:
+
+    def __init__(self, weighted_values):
+        self.values = [value for value, _ in weighted_values]
+        self.cumulative_weights = list(accumulate(weight for _, weight in weighted_values))
+
+    def pick(self, rng):
+        return rng.choices(self.values, cum_weights=self.cumulative_weights)[0]
+
+
+EMAIL_DOMAIN_CHOICES = Choices(EMAIL_DOMAINS)
+LOCATION_CHOICES = Choices(LOCATIONS)
+GENDER_CHOICES = Choices(GENDERS)
+VENDOR_CATEGORY_CHOICES = Choices(VENDOR_CATEGORIES)
+
+
+def make_email(rng, index, first_name, last_name):
+    # The index keeps addresses unique however many users share a name
+    first_name, last_name = first_name.lower(), last_name.lower()
+    local_part = rng.choice([
+        f'{first_name}.{last_name}{index}',
+        f'{first_name}{last_name}{index}',
+        f'{first_name[0]}{last_name}{index}',
+        f'{first_name}_{index}',
+    ])
+    return f'{local_part}@{EMAIL_DOMAIN_CHOICES.pick(rng)}'
+
+
+def make_mobile_number(index, prefix):
+    # Multiplying by a number coprime with 10 permutes the indexes, so numbers look random but never repeat
+    number = index * 7_654_321 % 10**MOBILE_NUMBER_DIGITS
+    return f'+{prefix}{number:0{MOBILE_NUMBER_DIGITS}d}'
+
+
+def make_coordinate(rng, center):
+    # Spread around the city center, with the precision of the `latitude` and `longitude` fields
+    return Decimal(f'{center + rng.gauss(0, 0.05):.6f}')
+
+
+def generate_users(rng, start, count, total, now, days, vendor_rate):
+    """
+    Yield `(user, vendor)` pairs for users `start` to `start + count` of `total`: the user's `USER_COLUMNS` values
+    without the id and password, and the `VENDOR_COLUMNS` values without the id, or None if it is not a vendor.
+
+    Signups grow linearly over the `days` days before `now` up to user `total`, and users come oldest first, as ids
+    are assigned.
+    """
+    for index in range(start, start + count):
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        # The density of signups at time t is proportional to t
+        created_at = now - timedelta(days=days * (1 - math.sqrt((index + rng.random()) / total)))
+
+        # Email only, both, or mobile number only
+        channel = rng.random()
+        location, latitude, longitude, mobile_prefix = LOCATION_CHOICES.pick(rng)
+        email = make_email(rng, index, first_name, last_name) if channel < 0.8 else None
+        mobile_number = make_mobile_number(index, mobile_prefix) if channel > 0.5 else None
+
+        is_routable = True
+        if rng.random() < UNKNOWN_LOCATION_RATE:
+            location, latitude, longitude = 'Unknown', None, None
+            is_routable = rng.random() < 0.5
+        else:
+            latitude, longitude = make_coordinate(rng, latitude), make_coordinate(rng, longitude)
+
+        # Email accounts stay inactive until activated, and a few accounts were deactivated later
+        email_verified = email is not None and rng.random() < 0.7
+        phone_verified = mobile_number is not None and rng.random() < 0.8
+        is_active = (email is None or email_verified) and rng.random() > 0.02
+        is_vendor = rng.random() < vendor_rate
+
+        date_of_birth = None
+        if rng.random() < 0.6:
+            date_of_birth = created_at.date() - timedelta(days=rng.randint(18 * 365, 70 * 365))
+        address = f'{rng.randint(1, 9999)} {rng.choice(STREETS)} St' if rng.random() < 0.4 else None
+        last_login = None
+        if rng.random() < 0.7:
+            last_login = created_at + (now - created_at) * rng.random()
+
+        user = (
+            last_login, first_name, last_name, f'{SYNTHETIC_USERNAME_PREFIX}{index}', email, date_of_birth, is_active,
+            False, is_vendor, False, address, GENDER_CHOICES.pick(rng), None, mobile_number, email_verified,
+            phone_verified, created_at, location, is_routable, None, None, latitude, longitude, 1, last_login or
+            created_at
+        )
+        vendor = None
+        if is_vendor:
+            category = VENDOR_CATEGORY_CHOICES.pick(rng)
+            vendor = (f'{last_name} {category or "Trading"}', category)
+        yield user, vendor
+
+
+def format_copy_value(value):
+    # `COPY` text format, generated values never contain tabs, newlines or backslashes that would need escaping
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return str(value)
+
+
+def copy_rows(cursor, table, columns, rows):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(map(format_copy_value, row)))
+        buffer.write('\n')
+    buffer.seek(0)
+    cursor.copy_expert(f'COPY {table} ({", ".join(columns)}) FROM STDIN', buffer)
+
+
+def load_users(users, password, using='default'):
+    """
+    Insert `generate_users()` pairs with `COPY` and add them to the user rollups, in one transaction.
+    """
+    table = UserAccount._meta.db_table
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        # Ids are taken up front, vendor rows need them
+        cursor.execute(
+            'SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+            [table, 'id', len(users)]
+        )
+        user_ids = [row[0] for row in cursor.fetchall()]
+
+        user_rows = []
+        vendor_rows = []
+        rollup_counts = Counter()
+        for user_id, (user, vendor) in zip(user_ids, users):
+            user_rows.append((user_id, password, *user))
+            if vendor is not None:
+                vendor_rows.append((user_id, *vendor))
+            rollup_counts[get_rollup_key([user[index] for index in ROLLUP_INDEXES])] += 1
+
+        # The underlying psycopg2 cursor, Django's wrapper has no `COPY` support
+        copy_rows(cursor.cursor, table, USER_COLUMNS, user_rows)
+        copy_rows(cursor.cursor, VendorUser._meta.db_table, VENDOR_COLUMNS, vendor_rows)
+        UserRollup.objects.add(rollup_counts, using)
+
+
+def generate_population(count, seed=0, offset=0, batch_size=10_000, days=3 * 365, vendor_rate=0.05, using='default'):
+    """
+    Generate and load `count` synthetic users numbered from `offset`, yielding how many are loaded after each batch.
+    """
+    now = timezone.now()
+    # Hashed once, hashing millions of passwords would take days
+    password = make_password(SYNTHETIC_PASSWORD)
+    total = offset + count
+    for start in range(offset, total, batch_size):
+        batch_count = min(batch_size, total - start)
+        rng = random.Random(f'{seed}:{start}')
+        load_users(list(generate_users(rng, start, batch_count, total, now, days, vendor_rate)), password, using)
+        yield start + batch_count - offset
+
+    with connections[using].cursor() as cursor:
+        # Fresh planner statistics, like autovacuum keeps for production tables
+        cursor.execute(f'ANALYZE {UserAccount._meta.db_table}, {VendorUser._meta.db_table}')
@@ -0,0 +1,143 @@
+import hashlib
+from collections.abc import Mapping
+
+from django.core.exceptions import ValidationError
+from rest_framework.throttling import SimpleRateThrottle
+
+from .models import normalize_mobile_number
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    Rate throttle backed by a sliding window counter instead of DRF's per-client request history.
+
+    Each client is tracked with two integer counters, one for the current fixed window and one for the previous,
+    and the request rate is estimated by weighting the previous window by how much of it still overlaps the sliding
+    window. Counters are bumped with atomic cache increments, so the state is a couple of integers per client
+    no matter the rate, and concurrent workers sharing the cache never overwrite each other's hits.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        self.elapsed = (self.now % self.duration) / self.duration
+
+        self.current = self.increment(f'{self.key}:{window}')
+        self.previous = self.cache.get(f'{self.key}:{window - 1}', 0)
+
+        if self.previous * (1 - self.elapsed) + self.current > self.num_requests:
+            return self.throttle_failure()
+
+        return self.throttle_success()
+
+    def increment(self, key):
+        # Counter must outlive the window it counts because it is read back as the "previous" window
+        self.cache.add(key, 0, self.duration * 2)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Expired between `add` and `incr`
+            self.cache.set(key, 1, self.duration * 2)
+            return 1
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        if self.current > self.num_requests:
+            # Wait for the next window, then for enough of it to pass that this window's hits weigh less
+            return self.duration * (1 - self.elapsed + max(1 - self.num_requests / self.current, 0))
+
+        # Only the previous window is keeping us over the limit, wait until its weight drops enough
+        overlap = 1 - (self.num_requests - self.current) / self.previous
+        return max(overlap - self.elapsed, 0) * self.duration
+
+    @staticmethod
+    def hash_identity(value):
+        return hashlib.blake2b(value.encode(), digest_size=8).hexdigest()
+
+
+class IPRateThrottle(SlidingWindowRateThrottle):
+    # Keyed by `get_ident()`, which only trusts `X-Forwarded-For` as far as `NUM_PROXIES` proxies add to it
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class IdentityRateThrottle(SlidingWindowRateThrottle):
+    """
+    Throttle keyed by the account being targeted (email or mobile number) rather than by the client.
+
+    This is what stops distributed credential stuffing against a single account, which per IP throttles cannot.
+    """
+    identity_fields = ('email', 'mobile_number')
+
+    def get_cache_key(self, request, view):
+        if not isinstance(request.data, Mapping):
+            return None
+
+        for field in self.identity_fields:
+            value = request.data.get(field)
+            if isinstance(value, str) and value.strip():
+                return self.cache_format % {
+                    'scope': self.scope,
+                    'ident': self.hash_identity(self.get_identity(field, value)),
+                }
+
+        return None
+
+    def get_identity(self, field, value):
+        # Every way of writing the same number counts against the same account
+        if field == 'mobile_number':
+            try:
+                return normalize_mobile_number(value)
+            except ValidationError:
+                pass
+
+        return value.strip().lower()
+
+
+class GlobalRateThrottle(SlidingWindowRateThrottle):
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': 'global'}
+
+
+class LoginIPRateThrottle(IPRateThrottle):
+    scope = 'login_ip'
+
+
+class LoginIdentityRateThrottle(IdentityRateThrottle):
+    scope = 'login_identity'
+
+
+class LoginGlobalRateThrottle(GlobalRateThrottle):
+    scope = 'login_global'
+
+
+class OTPIPRateThrottle(IPRateThrottle):
+    scope = 'otp_ip'
+
+
+class OTPIdentityRateThrottle(IdentityRateThrottle):
+    scope = 'otp_identity'
+
+
+class OTPGlobalRateThrottle(GlobalRateThrottle):
+    scope = 'otp_global'
+
+
+class IntrospectionIPRateThrottle(IPRateThrottle):
+    scope = 'introspection_ip'
+
+
+LOGIN_THROTTLE_CLASSES = [LoginIPRateThrottle, LoginIdentityRateThrottle, LoginGlobalRateThrottle]
+OTP_THROTTLE_CLASSES = [OTPIPRateThrottle, OTPIdentityRateThrottle, OTPGlobalRateThrottle]
+INTROSPECTION_THROTTLE_CLASSES = [IntrospectionIPRateThrottle]
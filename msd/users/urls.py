@@ -1,9 +1,14 @@
 from django.urls import path, re_path
+from rest_framework.routers import DefaultRouter
 
 from .views import (
-    CustomProviderAuthView, CustomTokenObtainPairView, CustomTokenRefreshView, CustomTokenVerifyView, LogoutView
+    CustomProviderAuthView, CustomTokenObtainPairView, CustomTokenRefreshView, CustomTokenVerifyView,
+    JSONWebKeySetView, LogoutView, MobileOTPView, MobileTokenObtainPairView, TokenIntrospectionView, UserViewSet
 )
 
+router = DefaultRouter()
+router.register('users', UserViewSet)
+
 urlpatterns = [
     re_path(
         r'^o/(?P<provider>\S+)/$',
@@ -11,7 +16,11 @@ urlpatterns = [
         name='provider-auth',
     ),
     path('jwt/create/', CustomTokenObtainPairView.as_view()),
+    path('jwt/mobile/otp/', MobileOTPView.as_view()),
+    path('jwt/mobile/create/', MobileTokenObtainPairView.as_view()),
     path('jwt/refresh/', CustomTokenRefreshView.as_view()),
     path('jwt/verify/', CustomTokenVerifyView.as_view()),
+    path('jwt/introspect/', TokenIntrospectionView.as_view()),
+    path('jwt/keys/', JSONWebKeySetView.as_view()),
     path('logout/', LogoutView.as_view()),
-]
+] + router.urls
@@ -1,16 +1,48 @@
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.utils.translation import gettext as _
+from djoser import views as djoser_views
 from djoser.social.views import ProviderAuthView
 from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView, TokenVerifyView
 
 from msd.project.settings.auth import (
     AUTH_COOKIE_HTTP_ONLY, AUTH_COOKIE_MAX_AGE, AUTH_COOKIE_PATH, AUTH_COOKIE_SAMESITE, AUTH_COOKIE_SECURE
 )
 
+from .activity import record_login
+from .backends import get_user_by_mobile_number
+from .caching import cache_profile, get_cached_profile
+from .geolocation import update_user_location
+from .introspection import introspect_tokens
+from .permissions import CanBatchRegister
+from .registration import register_users
+from .revocation import revocation_list
+from .rollups import get_user_stats
+from .serializers import (
+    BatchRegistrationSerializer, CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer,
+    CustomTokenVerifySerializer, LogoutSerializer, MobileOTPSerializer, MobileTokenObtainPairSerializer,
+    TokenIntrospectionSerializer, UserStatsSerializer
+)
+from .signing import get_jwks
+from .sms import send_sms
+from .throttling import INTROSPECTION_THROTTLE_CLASSES, LOGIN_THROTTLE_CLASSES, OTP_THROTTLE_CLASSES
+
 
 class CustomProviderAuthView(ProviderAuthView):
 
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        record_login(serializer.validated_data['user'])
+        update_user_location(serializer.validated_data['user'], self.request)
+
     def post(self, request, *args, **kwargs):
         response = super().post(request, *args, **kwargs)
 
@@ -41,6 +73,8 @@ class CustomProviderAuthView(ProviderAuthView):
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
+    serializer_class = CustomTokenObtainPairSerializer
+    throttle_classes = LOGIN_THROTTLE_CLASSES
 
     def post(self, request, *args, **kwargs):
         response = super().post(request, *args, **kwargs)
@@ -71,7 +105,33 @@ class CustomTokenObtainPairView(TokenObtainPairView):
         return response
 
 
+class MobileTokenObtainPairView(CustomTokenObtainPairView):
+    serializer_class = MobileTokenObtainPairSerializer
+
+
+class MobileOTPView(APIView):
+    """
+    Text a one-time login code to a mobile number, for `MobileTokenObtainPairView`.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    throttle_classes = OTP_THROTTLE_CLASSES
+
+    def post(self, request, *args, **kwargs):
+        serializer = MobileOTPSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        user = get_user_by_mobile_number(serializer.validated_data['mobile_number'])
+        if user is not None and user.is_active:
+            code = user.set_verification_code()
+            send_sms(user.mobile_number, _('Your verification code is {code}.').format(code=code))
+
+        # The same response whether or not the number has an account, so that it can't be used to probe for them
+        return Response(status=status.HTTP_202_ACCEPTED)
+
+
 class CustomTokenRefreshView(TokenRefreshView):
+    serializer_class = CustomTokenRefreshSerializer
 
     def post(self, request, *args, **kwargs):
         refresh_token = request.COOKIES.get('refresh')
@@ -83,6 +143,7 @@ class CustomTokenRefreshView(TokenRefreshView):
 
         if response.status_code == 200:
             access_token = response.data.get('access')
+            refresh_token = response.data.get('refresh')
 
             response.set_cookie(
                 'access',
@@ -94,10 +155,22 @@ class CustomTokenRefreshView(TokenRefreshView):
                 samesite=AUTH_COOKIE_SAMESITE,
             )
 
+            if refresh_token:
+                response.set_cookie(
+                    'refresh',
+                    refresh_token,
+                    max_age=AUTH_COOKIE_MAX_AGE,
+                    path=AUTH_COOKIE_PATH,
+                    secure=AUTH_COOKIE_SECURE,
+                    httponly=AUTH_COOKIE_HTTP_ONLY,
+                    samesite=AUTH_COOKIE_SAMESITE,
+                )
+
         return response
 
 
 class CustomTokenVerifyView(TokenVerifyView):
+    serializer_class = CustomTokenVerifySerializer
 
     def post(self, request, *args, **kwargs):
         access_token = request.COOKIES.get('access')
@@ -108,11 +181,109 @@ class CustomTokenVerifyView(TokenVerifyView):
         return super().post(request, *args, **kwargs)
 
 
+class TokenIntrospectionView(APIView):
+    """
+    Check many tokens in one request, for gateways that would otherwise call `jwt/verify/` once per token.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    throttle_classes = INTROSPECTION_THROTTLE_CLASSES
+
+    def post(self, request, *args, **kwargs):
+        serializer = TokenIntrospectionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        response = Response({'results': introspect_tokens(serializer.validated_data['tokens'])})
+        patch_cache_control(response, no_store=True)
+        return response
+
+
+class JSONWebKeySetView(APIView):
+    """
+    Publish the public keys tokens are signed with, so that other services can verify them locally.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        response = Response(get_jwks())
+        patch_cache_control(response, public=True, max_age=settings.JWT_KEY_SET_MAX_AGE)
+        return response
+
+
 class LogoutView(APIView):
 
     def post(self, request, *args, **kwargs):
+        serializer = LogoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        revocation_list.revoke(request.auth)
+
+        refresh_token = request.COOKIES.get('refresh') or serializer.validated_data.get('refresh')
+        if refresh_token:
+            try:
+                revocation_list.revoke(RefreshToken(refresh_token))
+            except TokenError:
+                # Already expired or invalid, nothing left to revoke
+                pass
+
         response = Response(status=status.HTTP_204_NO_CONTENT)
         response.delete_cookie('access')
         response.delete_cookie('refresh')
 
         return response
+
+
+class UserViewSet(djoser_views.UserViewSet):
+    # Actions that hash a password or send an email/OTP, throttled before any of that work happens
+    otp_throttled_actions = ('create', 'activation', 'resend_activation', 'reset_password', 'reset_password_confirm')
+
+    def get_throttles(self):
+        if self.action in self.otp_throttled_actions:
+            return [throttle() for throttle in OTP_THROTTLE_CLASSES]
+
+        return super().get_throttles()
+
+    @action(['post'],
+            detail=False,
+            permission_classes=[CanBatchRegister],
+            serializer_class=BatchRegistrationSerializer)
+    def batch(self, request, *args, **kwargs):
+        """
+        Register up to `BATCH_REGISTRATION_MAX_USERS` users at once, for partner integrations.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({'results': register_users(serializer.validated_data['users'])})
+
+    @action(['get'], detail=False, permission_classes=[IsAdminUser], serializer_class=UserStatsSerializer)
+    def stats(self, request, *args, **kwargs):
+        """
+        Signups per day and demographics of the users who signed up in a period, served from `UserRollup`.
+        """
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(get_user_stats(**serializer.validated_data))
+
+    @action(['get', 'put', 'patch', 'delete'], detail=False)
+    def me(self, request, *args, **kwargs):
+        if request.method != 'GET':
+            return super().me(request, *args, **kwargs)
+
+        # `request.user` normally comes from the user cache, so an unchanged profile needs no database read
+        user = request.user
+        etag = f'W/"{user.pk}-{user.profile_version}"'
+        last_modified = int(user.updated_at.timestamp())
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            data = get_cached_profile(user)
+            if data is None:
+                data = self.get_serializer(user).data
+                cache_profile(user, data)
+
+            response = Response(data)
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response